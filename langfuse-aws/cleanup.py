@@ -10,7 +10,6 @@ import subprocess
 import sys
 import threading
 import time
-from pathlib import Path
 
 
 def run_command(cmd, check=True):
@@ -153,28 +152,32 @@ def main():
     files_to_remove = [
         "cdk.context.json",
         ".env",
-        "cdk.out"
+        "cdk.out",
+        "cdk-outputs.json"
     ]
     
-    for file_path in files_to_remove:
-        if os.path.exists(file_path):
-            if os.path.isdir(file_path):
-                shutil.rmtree(file_path)
-                print(f"   Removed directory: {file_path}")
-            else:
-                os.remove(file_path)
-                print(f"   Removed file: {file_path}")
-    
-    # Clean up Python cache
-    cache_dirs = ["__pycache__", ".pytest_cache", ".mypy_cache"]
-    for cache_dir in cache_dirs:
-        for path in Path(".").rglob(cache_dir):
+    # One directory read instead of an exists + isdir stat pair per candidate
+    with os.scandir(".") as entries:
+        targets = [entry for entry in entries if entry.name in files_to_remove]
+    for entry in targets:
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+            print(f"   Removed directory: {entry.name}")
+        else:
+            os.remove(entry.path)
+            print(f"   Removed file: {entry.name}")
+    
+    # Clean up Python caches and stray .pyc files in a single tree walk
+    cache_dirs = {"__pycache__", ".pytest_cache", ".mypy_cache"}
+    for root, dirs, files in os.walk("."):
+        for cache_dir in [d for d in dirs if d in cache_dirs]:
+            path = os.path.normpath(os.path.join(root, cache_dir))
             shutil.rmtree(path)
             print(f"   Removed cache: {path}")
-    
-    # Remove .pyc files
-    for pyc_file in Path(".").rglob("*.pyc"):
-        pyc_file.unlink()
+            dirs.remove(cache_dir)
+        for name in files:
+            if name.endswith(".pyc"):
+                os.remove(os.path.join(root, name))
     
     print("\n✅ Cleanup completed!")
     print("\nNote: Please check AWS console to ensure all resources were removed.")
@@ -17,6 +17,10 @@ import time
 from pathlib import Path
 
 
+# Stack outputs written by `cdk deploy`, so they can be read without another AWS call
+OUTPUTS_FILE = "cdk-outputs.json"
+
+
 def run_command(command, capture_output=True, check=True):
     """Run a shell command and return the output."""
     try:
@@ -124,8 +128,12 @@ def deploy_stacks():
     
     start_time = time.time()
     
-    # Deploy all stacks
-    _, _, code = run_command("cdk deploy --require-approval never --all", capture_output=False)
+    # Deploy all stacks; stacks that don't depend on each other (e.g. ECR, VPC, S3)
+    # are deployed concurrently, and progress is streamed as events rather than a redrawn bar
+    _, _, code = run_command(
+        f"cdk deploy --require-approval never --all --concurrency 4 --progress events --outputs-file {OUTPUTS_FILE}",
+        capture_output=False
+    )
     
     if code != 0:
         print("\nError: CDK deployment failed!")
@@ -138,10 +146,28 @@ def deploy_stacks():
     print(f"\n✓ Deployment complete! (took {minutes}m {seconds}s)")
 
 
+def to_url(dns_value):
+    """Prefix the ALB DNS name with http:// unless it already has a protocol."""
+    if dns_value.startswith('http://') or dns_value.startswith('https://'):
+        return dns_value
+    return f"http://{dns_value}"
+
+
 def get_langfuse_url():
     """Retrieve the Langfuse URL from CloudFormation outputs."""
     print("\nRetrieving Langfuse URL...")
     
+    # Prefer the outputs file from the deploy we just ran
+    outputs_path = Path(OUTPUTS_FILE)
+    if outputs_path.exists():
+        try:
+            outputs = json.loads(outputs_path.read_text())
+            dns_value = outputs.get('LangfuseWebECSServiceStack', {}).get('LoadBalancerDNS')
+            if dns_value:
+                return to_url(dns_value)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Error reading {OUTPUTS_FILE}: {e}")
+    
     region = os.environ['CDK_DEFAULT_REGION']
     
     # Get ALB DNS from CloudFormation stack
@@ -156,19 +182,12 @@ def get_langfuse_url():
         return None
     
     try:
-        import json
         stack_info = json.loads(stdout)
         outputs = stack_info['Stacks'][0].get('Outputs', [])
         
         for output in outputs:
             if output['OutputKey'] == 'LoadBalancerDNS':
-                dns_value = output['OutputValue']
-                # Check if the value already has a protocol prefix
-                if dns_value.startswith('http://') or dns_value.startswith('https://'):
-                    url = dns_value
-                else:
-                    url = f"http://{dns_value}"
-                return url
+                return to_url(output['OutputValue'])
     except Exception as e:
         print(f"Warning: Error parsing stack outputs: {e}")
     
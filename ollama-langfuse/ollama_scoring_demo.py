@@ -15,12 +15,18 @@ import os
 import sys
 import json
 import time
+import secrets
 from datetime import datetime
 from dotenv import load_dotenv
 from langfuse.openai import OpenAI
 from langfuse import Langfuse
 from typing import Dict, Any, List
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
@@ -58,7 +64,19 @@ def evaluate_response(response: str, expected: str) -> float:
     return 1.0 if expected.lower() in response.lower() else 0.0
 
 
-def main(session_id=None):
+def save_results(path: str, payload: Dict[str, Any]) -> None:
+    """Write results as indented JSON, serializing with orjson when available"""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    else:
+        # Serialize first so the file is written in one call rather than per chunk
+        with open(path, "w") as f:
+            f.write(json.dumps(payload, indent=2))
+
+
+def run(session_id=None) -> Dict[str, Any]:
+    """Run the scoring demo and return the saved results payload"""
     # Initialize clients
     # The OpenAI client automatically creates traces
     openai_client = OpenAI(
@@ -70,7 +88,7 @@ def main(session_id=None):
     langfuse_client = Langfuse()
     
     if not session_id:
-        session_id = f"simple-scoring-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        session_id = f"simple-scoring-{secrets.token_hex(4)}"
     
     print("🎯 Ollama + Langfuse Simple Scoring Demo")
     print(f"📦 Using model: {model}")
@@ -192,13 +210,13 @@ def main(session_id=None):
     
     # Save results
     output_file = f"simple_scoring_results_{session_id}.json"
-    with open(output_file, "w") as f:
-        json.dump({
-            "session_id": session_id,
-            "timestamp": datetime.now().isoformat(),
-            "model": model,
-            "results": scored_results
-        }, f, indent=2)
+    payload = {
+        "session_id": session_id,
+        "timestamp": datetime.now().isoformat(),
+        "model": model,
+        "results": scored_results
+    }
+    save_results(output_file, payload)
     
     print(f"\n💾 Results saved to {output_file}")
     print(f"🔍 Check Langfuse at {os.getenv('LANGFUSE_HOST')} to see traces and scores")
@@ -208,8 +226,9 @@ def main(session_id=None):
     langfuse_client.flush()
     
     print("\n✅ Demo complete!")
+    return payload
 
 
 if __name__ == "__main__":
     session_id = sys.argv[1] if len(sys.argv) > 1 else None
-    main(session_id)
\ No newline at end of file
+    run(session_id)
\ No newline at end of file
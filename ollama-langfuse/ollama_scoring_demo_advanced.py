@@ -22,12 +22,20 @@ Features:
 import os
 import sys
 import json
-import time
+import re
+import secrets
+from bisect import bisect_right
 from datetime import datetime
+from functools import lru_cache, partial
 from dotenv import load_dotenv
 from langfuse.openai import OpenAI
 from langfuse import Langfuse, get_client
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Load environment variables
 load_dotenv()
@@ -38,6 +46,11 @@ model = os.getenv('OLLAMA_MODEL', 'llama3.1:8b')
 # Initialize Langfuse client for scoring
 langfuse_client = Langfuse()
 
+# Score bands: bisect_right(SCORE_THRESHOLDS, score) indexes the tuples below
+SCORE_THRESHOLDS = (0.5, 0.8)
+SCORE_BANDS = ("failed", "partial", "passed")
+SCORE_EMOJIS = ("❌", "⚠️", "✅")
+
 # Test cases with expected behaviors
 TEST_CASES = [
     # Test 1: Simple math - correct answer expected
@@ -101,20 +114,30 @@ TEST_CASES = [
 ]
 
 
+# Isolated numbers, or numbers followed by punctuation
+_NUMBER_RE = re.compile(r'\b(-?\d+\.?\d*)\b(?:[.,!?\s]|$)')
+
+
 def extract_number_from_response(response: str) -> str:
     """Extract number from a response string"""
-    import re
-    # Look for numbers in the response
-    # Match isolated numbers or numbers followed by punctuation
-    numbers = re.findall(r'\b(-?\d+\.?\d*)\b(?:[.,!?\s]|$)', response)
     # Return the last number found (usually the answer)
-    return numbers[-1] if numbers else ""
+    last = ""
+    for match in _NUMBER_RE.finditer(response):
+        last = match.group(1)
+    return last
+
 
+@lru_cache(maxsize=32)
+def _expected_number(expected: str) -> str:
+    """Number in an expected answer; TEST_CASES only has a handful, so cache them."""
+    return extract_number_from_response(expected)
 
-def score_exact_match(response: str, expected: str) -> Dict[str, Any]:
-    """Score based on exact match"""
+
+def score_exact_match(response: str, expected: str, expected_clean: Optional[str] = None) -> Dict[str, Any]:
+    """Score based on exact match (expected_clean may be passed in pre-normalized)"""
     response_clean = response.strip().lower()
-    expected_clean = expected.strip().lower()
+    if expected_clean is None:
+        expected_clean = expected.strip().lower()
     
     # Direct match
     if expected_clean in response_clean:
@@ -125,7 +148,7 @@ def score_exact_match(response: str, expected: str) -> Dict[str, Any]:
     
     # For numbers, extract and compare
     response_num = extract_number_from_response(response)
-    expected_num = extract_number_from_response(expected)
+    expected_num = _expected_number(expected)
     
     if response_num and expected_num and response_num == expected_num:
         return {
@@ -139,28 +162,60 @@ def score_exact_match(response: str, expected: str) -> Dict[str, Any]:
     }
 
 
+# Phrases that put a keyword in a negative context, matched in one pass
+NEGATIVE_PATTERNS = (
+    "who needs", "not", "isn't", "wasn't", "instead of", "rather than",
+    "forget", "wrong", "incorrect", "false"
+)
+_NEGATIVE_RE = re.compile("|".join(map(re.escape, NEGATIVE_PATTERNS)))
+
+
+@lru_cache(maxsize=32)
+def _keyword_scanner(keywords: Tuple[str, ...]) -> Tuple["re.Pattern[str]", Dict[str, Tuple[str, ...]]]:
+    """
+    Compile one pattern that finds every keyword in a single pass over a response.
+    
+    Returns the pattern and, for each keyword, the keywords that are prefixes of it.
+    """
+    unique = sorted(set(keywords), key=len, reverse=True)
+    # A lookahead capture reports overlapping hits; longer keywords go first so they win ties
+    alternation = "|".join(map(re.escape, unique))
+    # Any keyword matching at a position is a prefix of the longest one matching there
+    prefixes = {k: tuple(p for p in unique if k.startswith(p)) for k in unique}
+    return re.compile(f"(?=({alternation}))"), prefixes
+
+
+def _first_keyword_positions(text: str, keywords: Tuple[str, ...]) -> Dict[str, int]:
+    """Map each keyword found in text to the index of its first occurrence."""
+    if not keywords:
+        return {}
+    scanner, prefixes = _keyword_scanner(keywords)
+    positions = {}
+    for match in scanner.finditer(text):
+        # Record the prefix keywords too, so ("new york", "new") both count
+        for keyword in prefixes[match.group(1)]:
+            positions.setdefault(keyword, match.start())
+    return positions
+
+
 def score_keyword_match(response: str, required_keywords: List[str]) -> Dict[str, Any]:
     """Score based on presence of required keywords as the actual answer"""
     response_lower = response.lower()
     found = []
     missing = []
     
-    # Check for negative context around keywords
-    negative_patterns = [
-        "who needs", "not", "isn't", "wasn't", "instead of", "rather than",
-        "forget", "wrong", "incorrect", "false"
-    ]
+    # Locate every keyword once; the position is reused for the negative-context check
+    keywords_lower = tuple(keyword.lower() for keyword in required_keywords)
+    positions = _first_keyword_positions(response_lower, keywords_lower)
     
-    for keyword in required_keywords:
-        keyword_lower = keyword.lower()
-        if keyword_lower in response_lower:
+    for keyword, keyword_lower in zip(required_keywords, keywords_lower):
+        keyword_pos = positions.get(keyword_lower)
+        if keyword_pos is not None:
             # Check if the keyword is in a negative context
-            keyword_pos = response_lower.find(keyword_lower)
             context_start = max(0, keyword_pos - 50)
-            context = response_lower[context_start:keyword_pos]
             
-            # Check if any negative patterns appear before the keyword
-            is_negative = any(neg in context for neg in negative_patterns)
+            # Check if any negative patterns appear in the 50 characters before the keyword
+            is_negative = _NEGATIVE_RE.search(response_lower, context_start, keyword_pos) is not None
             
             # Also check if the response explicitly states a different answer
             if "buzz lightyear" in response_lower and keyword_lower == "neil armstrong":
@@ -187,16 +242,28 @@ def score_keyword_match(response: str, required_keywords: List[str]) -> Dict[str
     }
 
 
-def evaluate_response(response: str, test_case: Dict[str, Any]) -> Dict[str, Any]:
-    """Evaluate a response based on the test case scoring method"""
+def _make_scorer(test_case: Dict[str, Any]) -> Callable[[str], Dict[str, Any]]:
+    """Bind a test case's fixed inputs once, so scoring a response skips the method dispatch"""
     method = test_case["scoring_method"]
     
     if method == "exact_match":
-        return score_exact_match(response, test_case["expected_answer"])
+        expected = test_case["expected_answer"]
+        return partial(score_exact_match, expected=expected, expected_clean=expected.strip().lower())
     elif method == "keyword_match":
-        return score_keyword_match(response, test_case.get("required_keywords", []))
+        return partial(score_keyword_match, required_keywords=tuple(test_case.get("required_keywords", ())))
     else:
-        return {"score": 0.5, "reasoning": f"Unknown scoring method: {method}"}
+        result = {"score": 0.5, "reasoning": f"Unknown scoring method: {method}"}
+        return lambda response: dict(result)
+
+
+# Scorers for the fixed TEST_CASES, built once at import
+_SCORERS = {test_case["name"]: _make_scorer(test_case) for test_case in TEST_CASES}
+
+
+def evaluate_response(response: str, test_case: Dict[str, Any]) -> Dict[str, Any]:
+    """Evaluate a response based on the test case scoring method"""
+    scorer = _SCORERS.get(test_case["name"]) or _make_scorer(test_case)
+    return scorer(response)
 
 
 def generate_trace_id(session_id: str, test_case_name: str) -> str:
@@ -213,6 +280,17 @@ def generate_trace_id(session_id: str, test_case_name: str) -> str:
     return Langfuse.create_trace_id(seed=seed)
 
 
+def save_results(path: str, payload: Dict[str, Any]) -> None:
+    """Write results as indented JSON, serializing with orjson when available"""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    else:
+        # Serialize first so the file is written in one call rather than per chunk
+        with open(path, "w") as f:
+            f.write(json.dumps(payload, indent=2))
+
+
 def main(session_id=None):
     # Initialize the Langfuse OpenAI client
     client = OpenAI(
@@ -221,7 +299,7 @@ def main(session_id=None):
     )
     
     if not session_id:
-        session_id = f"scoring-demo-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        session_id = f"scoring-demo-{secrets.token_hex(4)}"
     
     print("🎯 Starting Ollama + Langfuse Scoring Demo")
     print(f"📦 Using model: {model}")
@@ -285,19 +363,12 @@ def main(session_id=None):
             
             # Color code the score
             score_value = score_result['score']
-            if score_value >= 0.8:
-                score_emoji = "✅"
-            elif score_value >= 0.5:
-                score_emoji = "⚠️"
-            else:
-                score_emoji = "❌"
+            band = bisect_right(SCORE_THRESHOLDS, score_value)
+            score_emoji = SCORE_EMOJIS[band]
             
             print(f"{score_emoji} Score: {score_value:.2f}")
             print(f"💭 Reasoning: {score_result['reasoning']}")
             
-            # Wait a moment to ensure trace is created
-            time.sleep(0.5)
-            
             # Score the trace using v3 span methods
             # Note: We're scoring immediately after getting the response
             # This is convenient for demos but has trade-offs:
@@ -328,7 +399,7 @@ def main(session_id=None):
                 print(f"📤 Numeric score sent to Langfuse: {score_value:.2f}")
                 
                 # Category score
-                category_score = "passed" if score_value >= 0.8 else "partial" if score_value >= 0.5 else "failed"
+                category_score = SCORE_BANDS[band]
                 span.score_trace(
                     name="test_result",
                     value=category_score,
@@ -379,13 +450,21 @@ def main(session_id=None):
     print("📊 SCORING SUMMARY")
     print("=" * 70)
     
-    # Overall stats
+    # Overall stats and per-category running totals, gathered in a single pass
     total_tests = len(results)
-    total_score = sum(r["score"] for r in results)
+    total_score = 0.0
+    band_counts = [0, 0, 0]  # failed, partial, passed
+    categories = {}  # category -> [count, score sum]
+    for r in results:
+        score = r["score"]
+        total_score += score
+        band_counts[bisect_right(SCORE_THRESHOLDS, score)] += 1
+        running = categories.setdefault(r["category"], [0, 0.0])
+        running[0] += 1
+        running[1] += score
+    failed, partial, passed = band_counts
     avg_score = total_score / total_tests if total_tests > 0 else 0
-    passed = sum(1 for r in results if r["score"] >= 0.8)
-    partial = sum(1 for r in results if 0.5 <= r["score"] < 0.8)
-    failed = sum(1 for r in results if r["score"] < 0.5)
+    by_category = {cat: total / count for cat, (count, total) in categories.items()}
     
     print(f"\nTotal Tests: {total_tests}")
     print(f"Average Score: {avg_score:.2f}")
@@ -395,22 +474,14 @@ def main(session_id=None):
     
     # Category breakdown
     print("\n📂 By Category:")
-    categories = {}
-    for r in results:
-        cat = r["category"]
-        if cat not in categories:
-            categories[cat] = []
-        categories[cat].append(r["score"])
-    
-    for cat, scores in categories.items():
-        cat_avg = sum(scores) / len(scores)
-        print(f"  {cat}: {cat_avg:.2f} (n={len(scores)})")
+    for cat, (count, total) in categories.items():
+        print(f"  {cat}: {total / count:.2f} (n={count})")
     
     # Detailed results
     print("\n📋 Detailed Results:")
     print("-" * 70)
     for r in results:
-        status = "✅" if r["score"] >= 0.8 else "⚠️" if r["score"] >= 0.5 else "❌"
+        status = SCORE_EMOJIS[bisect_right(SCORE_THRESHOLDS, r["score"])]
         print(f"{status} {r['test_case']}: {r['score']:.2f}")
         print(f"   Expected: {r['expected']}")
         print(f"   Got: {r['actual'][:100]}{'...' if len(r['actual']) > 100 else ''}")
@@ -420,21 +491,20 @@ def main(session_id=None):
     
     # Save results
     output_file = f"scoring_results_{session_id}.json"
-    with open(output_file, "w") as f:
-        json.dump({
-            "session_id": session_id,
-            "timestamp": datetime.now().isoformat(),
-            "trace_ids": trace_ids,
-            "summary": {
-                "total_tests": total_tests,
-                "average_score": avg_score,
-                "passed": passed,
-                "partial": partial,
-                "failed": failed,
-                "by_category": {cat: sum(scores)/len(scores) for cat, scores in categories.items()}
-            },
-            "results": results
-        }, f, indent=2)
+    save_results(output_file, {
+        "session_id": session_id,
+        "timestamp": datetime.now().isoformat(),
+        "trace_ids": trace_ids,
+        "summary": {
+            "total_tests": total_tests,
+            "average_score": avg_score,
+            "passed": passed,
+            "partial": partial,
+            "failed": failed,
+            "by_category": by_category
+        },
+        "results": results
+    })
     
     print(f"\n💾 Results saved to {output_file}")
     print(f"🔍 Check your Langfuse dashboard at {os.getenv('LANGFUSE_HOST')} to see the scores")
@@ -443,13 +513,17 @@ def main(session_id=None):
     
     # Ensure all events are sent before exiting
     print("\n🔄 Flushing events to Langfuse...")
-    langfuse_client.flush()
-    time.sleep(2)  # Give time for flush to complete
+    langfuse_client.flush()  # Blocks until the queue is drained
     
     print("\n✅ Scoring demo complete!")
     return session_id, trace_ids
 
 
+def run(session_id=None):
+    """Entry point used by run_scoring_and_validate.py"""
+    return main(session_id)
+
+
 if __name__ == "__main__":
     # Check if session ID was passed as command line argument
     session_id = sys.argv[1] if len(sys.argv) > 1 else None
@@ -15,7 +15,13 @@ import requests
 from dotenv import load_dotenv
 import json
 from base64 import b64encode
-import uuid
+import secrets
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 # Load environment variables
 load_dotenv()
@@ -23,6 +29,9 @@ load_dotenv()
 # Get model from environment or use default
 model = os.getenv('OLLAMA_MODEL', 'llama3.1:8b')
 
+# Shared HTTP session so Ollama and Langfuse calls reuse pooled keep-alive connections
+SESSION = requests.Session()
+
 def get_auth_header():
     """Create Basic Auth header for Langfuse API"""
     public_key = os.getenv('LANGFUSE_PUBLIC_KEY')
@@ -31,36 +40,43 @@ def get_auth_header():
     encoded_credentials = b64encode(credentials.encode()).decode('ascii')
     return {"Authorization": f"Basic {encoded_credentials}"}
 
+def _get_json(url, **kwargs):
+    """GET a Langfuse API endpoint and decode the JSON body from raw bytes"""
+    response = SESSION.get(url, headers=get_auth_header(), **kwargs)
+    response.raise_for_status()
+    return _loads(response.content)
+
 def run_ollama_example(script_name, session_id):
     """Run the Ollama example script with session ID"""
     print(f"🚀 Running {script_name}...")
     print(f"🆔 Session ID: {session_id}")
     start_time = time.time()
     
-    result = subprocess.run(
+    # Stream the child's output as it arrives instead of buffering it all
+    proc = subprocess.Popen(
         ["python", script_name, session_id],
-        capture_output=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=1,
         text=True
     )
-    
-    if result.returncode != 0:
-        print(f"❌ Error running example: {result.stderr}")
+    for line in proc.stdout:
+        sys.stdout.write(line)
+
+    if proc.wait() != 0:
+        print(f"❌ Error running example (exit code {proc.returncode})")
         return False, start_time
-    
-    print(result.stdout)
+
     return True, start_time
 
-def get_traces():
-    """Fetch traces from Langfuse API"""
+def get_traces(**filters):
+    """Fetch traces from Langfuse API, filtered server-side by the given query params"""
     host = os.getenv('LANGFUSE_HOST')
     url = f"{host}/api/public/traces"
-    headers = get_auth_header()
     
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return _get_json(url, params=filters)
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"❌ Error fetching traces: {e}")
         return None
 
@@ -68,13 +84,10 @@ def get_trace_details(trace_id):
     """Get detailed information about a specific trace"""
     host = os.getenv('LANGFUSE_HOST')
     url = f"{host}/api/public/traces/{trace_id}"
-    headers = get_auth_header()
     
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return _get_json(url)
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"❌ Error fetching trace details: {e}")
         return None
 
@@ -82,14 +95,11 @@ def get_observations(trace_id):
     """Get observations for a specific trace"""
     host = os.getenv('LANGFUSE_HOST')
     url = f"{host}/api/public/observations"
-    headers = get_auth_header()
     params = {"traceId": trace_id}
     
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return _get_json(url, params=params)
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"❌ Error fetching observations: {e}")
         return None
 
@@ -102,44 +112,36 @@ def validate_traces(start_time, session_id):
     print("⏳ Waiting 5 seconds for traces to be processed...")
     time.sleep(5)
     
-    # Get traces
-    traces_response = get_traces()
-    if not traces_response:
-        return False
-    
-    traces = traces_response.get('data', [])
-    print(f"\n📊 Found {len(traces)} total traces")
-    
-    if len(traces) == 0:
-        print("❌ No traces found!")
-        return False
-    
-    # Convert start_time to ISO format for comparison
+    # Convert start_time to ISO format for the server-side time filter
     from datetime import datetime, timezone
     start_datetime = datetime.fromtimestamp(start_time, tz=timezone.utc)
     
-    # Filter traces by session ID and time
+    # Let Langfuse filter by session ID, name and time instead of scanning client-side.
+    # Some SDK versions store the session ID JSON-quoted, so try that form as a fallback.
     ollama_traces = []
-    
-    for trace in traces[:20]:  # Check more traces
-        # Check if trace was created after start time
-        trace_created = trace.get('createdAt', '')
-        try:
-            trace_time = datetime.fromisoformat(trace_created.replace('Z', '+00:00'))
-            if trace_time < start_datetime:
-                continue
-        except:
-            continue
-        
-        # Check if this trace has our session ID
-        # Handle both quoted and unquoted session IDs
-        trace_session_id = trace.get('sessionId', '')
-        # Remove quotes if present
-        if trace_session_id.startswith('"') and trace_session_id.endswith('"'):
-            trace_session_id = trace_session_id[1:-1]
+    for session_filter in (session_id, f'"{session_id}"'):
+        traces_response = get_traces(
+            sessionId=session_filter,
+            fromTimestamp=start_datetime.isoformat(),
+            name='ollama-traces',
+            limit=50
+        )
+        if not traces_response:
+            return False
         
-        if trace_session_id == session_id and trace.get('name') == 'ollama-traces':
-            ollama_traces.append(trace)
+        ollama_traces = traces_response.get('data', [])
+        if ollama_traces:
+            break
+    
+    if not ollama_traces:
+        # Report how many traces exist at all, to tell "nothing exported" from "wrong filter"
+        all_traces_response = get_traces(limit=50)
+        if all_traces_response:
+            all_traces = all_traces_response.get('data', [])
+            print(f"\n📊 Found {len(all_traces)} total traces")
+            if len(all_traces) == 0:
+                print("❌ No traces found!")
+                return False
     
     if not ollama_traces:
         print(f"❌ No Ollama traces found with session ID: {session_id}")
@@ -190,7 +192,7 @@ def validate_traces(start_time, session_id):
 
 def main():
     # Generate unique session ID for this run
-    session_id = f"test-run-{str(uuid.uuid4())[:8]}"
+    session_id = f"test-run-{secrets.token_hex(4)}"
     
     # Check command line arguments
     if len(sys.argv) > 1 and sys.argv[1] == "simple":
@@ -207,7 +209,7 @@ def main():
     # Check if Ollama is running
     print("\n🔧 Checking prerequisites...")
     try:
-        response = requests.get("http://localhost:11434/api/tags")
+        response = SESSION.get("http://localhost:11434/api/tags")
         if response.status_code == 200:
             models = response.json().get('models', [])
             print(f"✅ Ollama is running with {len(models)} models")
@@ -231,7 +233,7 @@ def main():
     try:
         host = os.getenv('LANGFUSE_HOST')
         headers = get_auth_header()
-        response = requests.get(f"{host}/api/public/traces", headers=headers)
+        response = SESSION.get(f"{host}/api/public/traces", headers=headers)
         if response.status_code == 200:
             print(f"✅ Langfuse is accessible at {host}")
         else:
@@ -10,31 +10,56 @@ This script:
 """
 
 import os
+import re
 import sys
 import requests
+from base64 import b64encode
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Optional
 from dotenv import load_dotenv, dotenv_values
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+
+# Shared HTTP session: pooled keep-alive connections to Ollama and Langfuse
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10,
+                       max_retries=Retry(total=2, backoff_factor=0.1))
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+
+# Langfuse key formats, validated in one match instead of prefix + emptiness checks
+PUBLIC_KEY_RE = re.compile(r"^pk-lf-[A-Za-z0-9-]+$")
+SECRET_KEY_RE = re.compile(r"^sk-lf-[A-Za-z0-9-]+$")
 
-def check_ollama() -> bool:
-    """Check if Ollama is running"""
-    try:
-        response = requests.get("http://localhost:11434/api/tags", timeout=5)
-        return response.status_code == 200
-    except:
-        return False
 
+def masked(key: str) -> str:
+    """Mask the middle part of a key for display"""
+    return f"{key[:10]}...{key[-8:]}" if len(key) > 20 else key
 
-def get_available_models() -> List[Dict[str, str]]:
-    """Get list of available Ollama models"""
+
+def check_ollama() -> Optional[Dict]:
+    """Check if Ollama is running, returning its /api/tags listing if so"""
     try:
-        response = requests.get("http://localhost:11434/api/tags")
+        response = SESSION.get("http://localhost:11434/api/tags", timeout=5)
         if response.status_code == 200:
-            models = response.json().get('models', [])
-            return [{'name': m.get('name', ''), 'size': m.get('size', 0)} for m in models]
-        return []
-    except:
-        return []
+            return _loads(response.content)
+        return None
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def get_available_models(tags: Dict) -> List[Dict[str, str]]:
+    """Get list of available Ollama models from an /api/tags listing"""
+    # The parsed entries already carry 'name' and 'size'; hand them back as-is
+    return tags.get('models', [])
 
 
 def format_size(size_bytes: int) -> str:
@@ -69,7 +94,7 @@ def select_model(models: List[Dict[str, str]], current_model: Optional[str] = No
     
     # List available models
     for i, model in enumerate(models, 1):
-        size_str = format_size(model['size']) if model['size'] else 'Unknown size'
+        size_str = format_size(model['size']) if model.get('size') else 'Unknown size'
         recommended = " (RECOMMENDED)" if 'llama3.1:8b' in model['name'] else ""
         current = " (CURRENT)" if current_model and current_model == model['name'] else ""
         print(f"{i}. {model['name']} - {size_str}{recommended}{current}")
@@ -150,9 +175,7 @@ def get_langfuse_config(existing_config: Dict[str, str]) -> Dict[str, str]:
     # Get public key
     current_public = existing_config.get('LANGFUSE_PUBLIC_KEY', '')
     if current_public:
-        # Mask the middle part of the key for security
-        masked_key = current_public[:10] + '...' + current_public[-8:] if len(current_public) > 20 else current_public
-        prompt = f"Langfuse public key [current: {masked_key}]: "
+        prompt = f"Langfuse public key [current: {masked(current_public)}]: "
     else:
         prompt = "Langfuse public key (pk-lf-...): "
     
@@ -161,20 +184,18 @@ def get_langfuse_config(existing_config: Dict[str, str]) -> Dict[str, str]:
         if not public_key and current_public:
             config['LANGFUSE_PUBLIC_KEY'] = current_public
             break
-        elif public_key.startswith('pk-lf-'):
+        elif PUBLIC_KEY_RE.match(public_key):
             config['LANGFUSE_PUBLIC_KEY'] = public_key
             break
         elif public_key:
-            print("❌ Public key should start with 'pk-lf-'")
+            print("❌ Public key should look like 'pk-lf-...'")
         else:
             print("❌ Public key is required")
     
     # Get secret key
     current_secret = existing_config.get('LANGFUSE_SECRET_KEY', '')
     if current_secret:
-        # Mask the middle part of the key for security
-        masked_key = current_secret[:10] + '...' + current_secret[-8:] if len(current_secret) > 20 else current_secret
-        prompt = f"Langfuse secret key [current: {masked_key}]: "
+        prompt = f"Langfuse secret key [current: {masked(current_secret)}]: "
     else:
         prompt = "Langfuse secret key (sk-lf-...): "
     
@@ -183,36 +204,38 @@ def get_langfuse_config(existing_config: Dict[str, str]) -> Dict[str, str]:
         if not secret_key and current_secret:
             config['LANGFUSE_SECRET_KEY'] = current_secret
             break
-        elif secret_key.startswith('sk-lf-'):
+        elif SECRET_KEY_RE.match(secret_key):
             config['LANGFUSE_SECRET_KEY'] = secret_key
             break
         elif secret_key:
-            print("❌ Secret key should start with 'sk-lf-'")
+            print("❌ Secret key should look like 'sk-lf-...'")
         else:
             print("❌ Secret key is required")
     
     return config
 
 
+def langfuse_headers(config: Dict[str, str]) -> Dict[str, str]:
+    """Build the Basic auth headers for a Langfuse configuration"""
+    credentials = f"{config['LANGFUSE_PUBLIC_KEY']}:{config['LANGFUSE_SECRET_KEY']}"
+    return {
+        "Authorization": "Basic " + b64encode(credentials.encode()).decode('ascii'),
+        "Content-Type": "application/json"
+    }
+
+
 def test_langfuse_connection(config: Dict[str, str]) -> bool:
     """Test Langfuse connection with provided credentials"""
     try:
-        from base64 import b64encode
-        credentials = f"{config['LANGFUSE_PUBLIC_KEY']}:{config['LANGFUSE_SECRET_KEY']}"
-        encoded_credentials = b64encode(credentials.encode()).decode('ascii')
-        headers = {
-            "Authorization": f"Basic {encoded_credentials}",
-            "Content-Type": "application/json"
-        }
-        
-        response = requests.get(
+        headers = langfuse_headers(config)
+        response = SESSION.get(
             f"{config['LANGFUSE_HOST']}/api/public/traces",
             headers=headers,
             timeout=5
         )
         
         return response.status_code == 200
-    except:
+    except requests.RequestException:
         return False
 
 
@@ -257,9 +280,13 @@ def create_env_file(model: str, langfuse_config: Dict[str, str], existing_config
     
     env_lines.append("")  # End with newline
     
-    # Write .env file
-    with open('.env', 'w') as f:
-        f.write('\n'.join(env_lines))
+    # Write .env file in one call; new files are created owner-only since they hold secrets
+    payload = '\n'.join(env_lines).encode('utf-8')
+    fd = os.open('.env', os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
     
     if existing_config:
         print("\n✅ Updated .env file")
@@ -279,7 +306,8 @@ def main():
     
     # Check if Ollama is running
     print("\n🔍 Checking Ollama...")
-    if not check_ollama():
+    tags = check_ollama()
+    if tags is None:
         print("❌ Ollama is not running!")
         print("\nPlease start Ollama first:")
         print("  - macOS/Linux: ollama serve")
@@ -290,7 +318,7 @@ def main():
     print("✅ Ollama is running")
     
     # Get available models and select one
-    models = get_available_models()
+    models = get_available_models(tags)
     current_model = existing_config.get('OLLAMA_MODEL')
     selected_model = select_model(models, current_model)
     
@@ -6,9 +6,12 @@ This script fetches and displays recent traces from the Langfuse API.
 
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from base64 import b64encode
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables
 load_dotenv()
@@ -21,6 +24,14 @@ def get_auth_header():
     encoded_credentials = b64encode(credentials.encode()).decode('ascii')
     return {"Authorization": f"Basic {encoded_credentials}"}
 
+# Shared Langfuse session: pooled keep-alive connections sized for the observation fan-out
+SESSION = requests.Session()
+SESSION.headers.update(get_auth_header())
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16,
+                       max_retries=Retry(total=3, backoff_factor=0.2))
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
 def format_datetime(iso_string):
     """Format ISO datetime to readable format"""
     if not iso_string:
@@ -28,14 +39,20 @@ def format_datetime(iso_string):
     dt = datetime.fromisoformat(iso_string.replace('Z', '+00:00'))
     return dt.strftime("%Y-%m-%d %H:%M:%S UTC")
 
+def preview(value, max_content_length=100):
+    """Stringify a trace field and truncate it for display"""
+    text = str(value)
+    return text[:max_content_length] + "..." if len(text) > max_content_length else text
+
 def get_traces(limit=10):
     """Fetch traces from Langfuse API"""
     host = os.getenv('LANGFUSE_HOST')
     url = f"{host}/api/public/traces"
-    headers = get_auth_header()
+    # Let the server apply the limit and skip the scores/observations/metrics field groups
+    params = {"limit": limit, "fields": "core,io"}
     
     try:
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url, params=params)
         response.raise_for_status()
         data = response.json()
         return data.get('data', [])[:limit]
@@ -47,11 +64,10 @@ def get_observations(trace_id):
     """Get observations for a specific trace"""
     host = os.getenv('LANGFUSE_HOST')
     url = f"{host}/api/public/observations"
-    headers = get_auth_header()
     params = {"traceId": trace_id}
     
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = SESSION.get(url, params=params)
         response.raise_for_status()
         data = response.json()
         return data.get('data', [])
@@ -71,14 +87,19 @@ def main():
     
     print(f"\nShowing {len(traces)} most recent traces:\n")
     
+    # Fetch observations for every trace concurrently, then print in order
+    trace_ids = [trace.get('id') for trace in traces]
+    with ThreadPoolExecutor(max_workers=min(16, len(trace_ids))) as executor:
+        observations_by_trace = dict(zip(trace_ids, executor.map(get_observations, trace_ids)))
+    
     for i, trace in enumerate(traces, 1):
         print(f"Trace {i}:")
         print(f"  ID: {trace.get('id')}")
         print(f"  Created: {format_datetime(trace.get('createdAt'))}")
         print(f"  Name: {trace.get('name', 'N/A')}")
         
-        # Get observations for this trace
-        observations = get_observations(trace.get('id'))
+        # Observations for this trace
+        observations = observations_by_trace[trace.get('id')]
         
         if observations:
             print(f"  Observations: {len(observations)}")
@@ -92,12 +113,10 @@ def main():
         
         # Show input/output preview if available
         if trace.get('input'):
-            input_str = str(trace['input'])[:100] + "..." if len(str(trace['input'])) > 100 else str(trace['input'])
-            print(f"  Input: {input_str}")
+            print(f"  Input: {preview(trace['input'])}")
         
         if trace.get('output'):
-            output_str = str(trace['output'])[:100] + "..." if len(str(trace['output'])) > 100 else str(trace['output'])
-            print(f"  Output: {output_str}")
+            print(f"  Output: {preview(trace['output'])}")
         
         print("-" * 80)
     
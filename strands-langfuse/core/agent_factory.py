@@ -5,14 +5,21 @@ This module provides standardized functions for creating Bedrock models and
 Strands agents with proper Langfuse trace attributes.
 """
 import os
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, Sequence
 from strands import Agent
 from strands.models.bedrock import BedrockModel
 
+# Marks "not given", so Strands keeps its own default (printing) callback handler
+_DEFAULT_CALLBACK_HANDLER = object()
+
 
 def create_bedrock_model(model_id: Optional[str] = None, region: Optional[str] = None) -> BedrockModel:
     """
-    Create a configured Bedrock model instance.
+    Get a configured Bedrock model instance.
+    
+    Models are cached per (model_id, region), so agents built from the same
+    configuration share one model and its Bedrock client.
     
     Args:
         model_id: Bedrock model ID (defaults to env var BEDROCK_MODEL_ID)
@@ -22,19 +29,38 @@ def create_bedrock_model(model_id: Optional[str] = None, region: Optional[str] =
         BedrockModel: Configured Bedrock model instance
     """
     # Use provided values or fall back to environment variables
-    model = BedrockModel(
-        model_id=model_id or os.environ.get("BEDROCK_MODEL_ID", "us.anthropic.claude-3-5-sonnet-20241022-v2:0"),
-        region=region or os.environ.get("BEDROCK_REGION", "us-east-1")
+    return _cached_bedrock_model(
+        model_id or os.environ.get("BEDROCK_MODEL_ID", "us.anthropic.claude-3-5-sonnet-20241022-v2:0"),
+        region or os.environ.get("BEDROCK_REGION", "us-east-1")
     )
-    return model
+
+
+@lru_cache(maxsize=8)
+def _cached_bedrock_model(model_id: str, region: str) -> BedrockModel:
+    """Build one BedrockModel per model/region pair."""
+    return BedrockModel(model_id=model_id, region=region)
+
+
+def get_model_id(agent: Agent) -> Optional[str]:
+    """
+    Return the Bedrock model ID an agent was built with.
+    
+    Args:
+        agent: Agent created by create_agent
+        
+    Returns:
+        str: The model ID from the agent's model configuration, if set
+    """
+    return agent.model.get_config().get("model_id")
 
 
 def create_agent(
     system_prompt: str,
     session_id: str,
     user_id: str = "demo-user",
-    tags: Optional[List[str]] = None,
+    tags: Optional[Sequence[str]] = None,
     model: Optional[BedrockModel] = None,
+    callback_handler: Any = _DEFAULT_CALLBACK_HANDLER,
     **extra_attributes: Any
 ) -> Agent:
     """
@@ -44,20 +70,22 @@ def create_agent(
         system_prompt: System prompt for the agent
         session_id: Unique session ID for grouping related traces
         user_id: User identifier for the traces
-        tags: List of tags for filtering in Langfuse
-        model: Optional pre-configured Bedrock model (creates new if not provided)
+        tags: Tags (list or tuple) for filtering in Langfuse
+        model: Optional pre-configured Bedrock model (uses the shared default if not provided)
+        callback_handler: Optional Strands callback handler; pass None to stop the agent
+            streaming its output to stdout (e.g. when agents run in threads)
         **extra_attributes: Additional trace attributes to include
         
     Returns:
         Agent: Configured Strands agent with Langfuse integration
     """
-    # Create model if not provided
+    # Reuse the cached default model if none was provided
     if model is None:
         model = create_bedrock_model()
     
-    # Ensure tags is a list
+    # Default to no tags; tuples are accepted as-is
     if tags is None:
-        tags = []
+        tags = ()
     
     # Build trace attributes for Langfuse
     trace_attributes = {
@@ -67,11 +95,17 @@ def create_agent(
         **extra_attributes  # Include any additional attributes
     }
     
+    # Only override the callback handler when one was given
+    agent_kwargs = {}
+    if callback_handler is not _DEFAULT_CALLBACK_HANDLER:
+        agent_kwargs["callback_handler"] = callback_handler
+    
     # Create and return the agent
     agent = Agent(
         model=model,
         system_prompt=system_prompt,
-        trace_attributes=trace_attributes
+        trace_attributes=trace_attributes,
+        **agent_kwargs
     )
     
     return agent
@@ -81,9 +115,10 @@ def create_agent_with_context(
     system_prompt: str,
     session_id: str,
     user_id: str = "demo-user",
-    tags: Optional[List[str]] = None,
+    tags: Optional[Sequence[str]] = None,
     model: Optional[BedrockModel] = None,
     memory_size: int = 10,
+    callback_handler: Any = _DEFAULT_CALLBACK_HANDLER,
     **extra_attributes: Any
 ) -> Agent:
     """
@@ -96,9 +131,10 @@ def create_agent_with_context(
         system_prompt: System prompt for the agent
         session_id: Unique session ID for grouping related traces
         user_id: User identifier for the traces
-        tags: List of tags for filtering in Langfuse
+        tags: Tags (list or tuple) for filtering in Langfuse
         model: Optional pre-configured Bedrock model
         memory_size: Number of conversation turns to remember
+        callback_handler: Optional Strands callback handler (see create_agent)
         **extra_attributes: Additional trace attributes
         
     Returns:
@@ -113,5 +149,6 @@ def create_agent_with_context(
         user_id=user_id,
         tags=tags,
         model=model,
+        callback_handler=callback_handler,
         **extra_attributes
     )
\ No newline at end of file
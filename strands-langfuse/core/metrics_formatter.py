@@ -1,64 +1,123 @@
 """
 Metrics formatter for displaying Langfuse metrics in a dashboard format.
 """
+import math
 import os
-from typing import Dict, Any, Optional, List
+import threading
+from array import array
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 
 
-def format_dashboard_metrics(response: Any, trace_id: Optional[str] = None) -> str:
-    """
-    Format response metrics in a full dashboard format.
-    
-    Args:
-        response: The agent response object with metrics
-        trace_id: Optional trace ID to include in the output
-        
-    Returns:
-        Formatted string with metrics dashboard
-    """
-    # Extract metrics
+@lru_cache(maxsize=16)
+def _model_display_name(model_id: str) -> str:
+    """Derive a short display name from a Bedrock model ID."""
+    return model_id.split('.')[-1].split('-v')[0] if '.' in model_id else model_id
+
+
+@lru_cache(maxsize=1)
+def _get_model_info() -> Tuple[str, str]:
+    """Return (model_id, display name) for the configured Bedrock model, read once."""
+    model_id = os.environ.get('BEDROCK_MODEL_ID', 'claude-3.5-sonnet')
+    return model_id, _model_display_name(model_id)
+
+
+def _read_metrics(response: Any) -> Tuple[int, int, int, float]:
+    """Return (input_tokens, output_tokens, total_tokens, latency_ms) from a response."""
     metrics = response.metrics
-    total_tokens = metrics.accumulated_usage.get('totalTokens', 0)
-    input_tokens = metrics.accumulated_usage.get('inputTokens', 0)
-    output_tokens = metrics.accumulated_usage.get('outputTokens', 0)
-    latency_ms = metrics.accumulated_metrics.get('latencyMs', 0)
-    
+    usage = metrics.accumulated_usage
+    return (
+        usage.get('inputTokens', 0),
+        usage.get('outputTokens', 0),
+        usage.get('totalTokens', 0),
+        metrics.accumulated_metrics.get('latencyMs', 0)
+    )
+
+
+def _format_dashboard(input_tokens: int, output_tokens: int, total_tokens: int,
+                      latency_ms: float, trace_id: Optional[str],
+                      model_id: Optional[str]) -> str:
+    """Render the dashboard block from already extracted metrics."""
     # Calculate derived metrics
     latency_sec = latency_ms / 1000.0
     tokens_per_sec = total_tokens / latency_sec if latency_sec > 0 else 0
     
-    # Get model info from environment or default
-    model_id = os.environ.get('BEDROCK_MODEL_ID', 'claude-3.5-sonnet')
-    model_name = model_id.split('.')[-1].split('-v')[0] if '.' in model_id else model_id
+    # Use the caller's model, falling back to the environment default
+    model_name = _model_display_name(model_id) if model_id else _get_model_info()[1]
     
     # Cost calculation moved to TokenAggregator for end-of-demo summary
     
     # Format the dashboard
-    dashboard = f"""
-📊 Performance Metrics:
-   ├─ Tokens: {total_tokens} total ({input_tokens} input, {output_tokens} output)
-   ├─ Latency: {latency_sec:.2f} seconds
-   ├─ Throughput: {tokens_per_sec:.0f} tokens/second
-   ├─ Model: {model_name}"""
+    lines = [
+        "",
+        "📊 Performance Metrics:",
+        f"   ├─ Tokens: {total_tokens} total ({input_tokens} input, {output_tokens} output)",
+        f"   ├─ Latency: {latency_sec:.2f} seconds",
+        f"   ├─ Throughput: {tokens_per_sec:.0f} tokens/second",
+        f"   ├─ Model: {model_name}",
+    ]
     
     if trace_id:
-        dashboard += f"\n   ├─ Trace ID: {trace_id}"
+        lines.append(f"   ├─ Trace ID: {trace_id}")
+        lines.append(f"   └─ Session: {trace_id}")
     
-    dashboard += f"\n   └─ Session: {trace_id}" if trace_id else ""
+    return "\n".join(lines)
+
+
+def format_dashboard_metrics(response: Any, trace_id: Optional[str] = None,
+                             model_id: Optional[str] = None) -> str:
+    """
+    Format response metrics in a full dashboard format.
+    
+    Args:
+        response: The agent response object with metrics
+        trace_id: Optional trace ID to include in the output
+        model_id: Bedrock model ID that produced the response (defaults to env var BEDROCK_MODEL_ID)
+        
+    Returns:
+        Formatted string with metrics dashboard
+    """
+    return _format_dashboard(*_read_metrics(response), trace_id, model_id)
+
+
+def format_and_accumulate(response: Any, aggregator: 'TokenAggregator',
+                          query_name: Optional[str] = None,
+                          trace_id: Optional[str] = None,
+                          model_id: Optional[str] = None) -> str:
+    """
+    Format the dashboard for a response and add it to the aggregator in one pass.
     
-    return dashboard
+    Args:
+        response: The agent response object with metrics
+        aggregator: TokenAggregator collecting totals for the run
+        query_name: Label for this query in the aggregator
+        trace_id: Optional trace ID to include in the output
+        model_id: Bedrock model ID that produced the response
+        
+    Returns:
+        Formatted string with metrics dashboard
+    """
+    values = _read_metrics(response)
+    aggregator.add_metrics(*values, query_name=query_name, model_id=model_id)
+    return _format_dashboard(*values, trace_id, model_id)
 
 
 class TokenAggregator:
     """Aggregates token usage across multiple queries for cost calculation."""
     
     def __init__(self):
-        self.queries: List[Dict[str, Any]] = []
+        # Per-query details kept column-wise in compact typed arrays
+        self.query_names: List[str] = []
+        self.query_input_tokens = array('q')
+        self.query_output_tokens = array('q')
+        self.query_total_tokens = array('q')
+        self.query_latency_ms = array('d')
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.total_tokens = 0
         self.model_id = None
+        self.model_name = None
         
         # Pricing as of January 2025 - https://aws.amazon.com/bedrock/pricing/
         # Claude 3.7 Sonnet pricing
@@ -78,62 +137,94 @@ class TokenAggregator:
                 'output_per_1k': 0.015
             }
         }
+        # Rates for the active model, resolved once when the model ID is first seen
+        self._pricing = self.pricing['default']
+        # Demos may report responses from several threads at once
+        self._lock = threading.Lock()
     
-    def add_response(self, response: Any, query_name: Optional[str] = None):
+    @staticmethod
+    def _resolve_pricing_key(model_id: str) -> str:
+        """Map a Bedrock model ID to its key in the pricing table."""
+        model_id = model_id.lower()
+        if 'claude-3-7-sonnet' in model_id:
+            return 'claude-3-7-sonnet'
+        if 'claude-3-5-sonnet' in model_id:
+            return 'claude-3-5-sonnet'
+        return 'default'
+    
+    def add_response(self, response: Any, query_name: Optional[str] = None,
+                     model_id: Optional[str] = None):
         """Add a response's metrics to the aggregator."""
-        metrics = response.metrics
-        input_tokens = metrics.accumulated_usage.get('inputTokens', 0)
-        output_tokens = metrics.accumulated_usage.get('outputTokens', 0)
-        total_tokens = metrics.accumulated_usage.get('totalTokens', 0)
-        latency_ms = metrics.accumulated_metrics.get('latencyMs', 0)
-        
-        # Update totals
-        self.total_input_tokens += input_tokens
-        self.total_output_tokens += output_tokens
-        self.total_tokens += total_tokens
-        
-        # Store model ID from first response
-        if not self.model_id:
-            self.model_id = os.environ.get('BEDROCK_MODEL_ID', 'claude-3.5-sonnet')
-        
-        # Store query details
-        self.queries.append({
-            'name': query_name or f"Query {len(self.queries) + 1}",
-            'input_tokens': input_tokens,
-            'output_tokens': output_tokens,
-            'total_tokens': total_tokens,
-            'latency_ms': latency_ms
-        })
+        self.add_metrics(*_read_metrics(response), query_name=query_name, model_id=model_id)
+    
+    def add_metrics(self, input_tokens: int, output_tokens: int, total_tokens: int,
+                    latency_ms: float, query_name: Optional[str] = None,
+                    model_id: Optional[str] = None):
+        """Add already extracted metrics for one query to the aggregator."""
+        with self._lock:
+            # Update totals
+            self.total_input_tokens += input_tokens
+            self.total_output_tokens += output_tokens
+            self.total_tokens += total_tokens
+            
+            # Store model ID from first response
+            if not self.model_id:
+                if model_id:
+                    self.model_id, self.model_name = model_id, _model_display_name(model_id)
+                else:
+                    self.model_id, self.model_name = _get_model_info()
+                self._pricing = self.pricing[self._resolve_pricing_key(self.model_id)]
+            
+            # Store query details
+            self.query_names.append(query_name or f"Query {len(self.query_names) + 1}")
+            self.query_input_tokens.append(input_tokens)
+            self.query_output_tokens.append(output_tokens)
+            self.query_total_tokens.append(total_tokens)
+            self.query_latency_ms.append(latency_ms)
+    
+    @property
+    def queries(self) -> List[Dict[str, Any]]:
+        """Per-query details as a list of dicts, built on demand."""
+        return [
+            {
+                'name': name,
+                'input_tokens': input_tokens,
+                'output_tokens': output_tokens,
+                'total_tokens': total_tokens,
+                'latency_ms': latency_ms
+            }
+            for name, input_tokens, output_tokens, total_tokens, latency_ms in zip(
+                self.query_names, self.query_input_tokens, self.query_output_tokens,
+                self.query_total_tokens, self.query_latency_ms
+            )
+        ]
     
     def calculate_total_cost(self) -> float:
         """Calculate the total estimated cost."""
-        # Determine pricing based on model
-        model_key = 'default'
-        if self.model_id:
-            if 'claude-3-7-sonnet' in self.model_id.lower():
-                model_key = 'claude-3-7-sonnet'
-            elif 'claude-3-5-sonnet' in self.model_id.lower():
-                model_key = 'claude-3-5-sonnet'
-        
-        pricing = self.pricing[model_key]
-        input_cost = (self.total_input_tokens / 1000) * pricing['input_per_1k']
-        output_cost = (self.total_output_tokens / 1000) * pricing['output_per_1k']
-        
-        return input_cost + output_cost
+        # Token totals are exact integers; apply the rates and divide once at the end
+        # so the result does not depend on how many queries were accumulated
+        pricing = self._pricing
+        return math.fsum((
+            self.total_input_tokens * pricing['input_per_1k'],
+            self.total_output_tokens * pricing['output_per_1k']
+        )) / 1000
     
     def format_total_cost(self) -> str:
         """Format the total cost summary."""
         total_cost = self.calculate_total_cost()
-        model_name = self.model_id.split('.')[-1].split('-v')[0] if self.model_id and '.' in self.model_id else self.model_id
+        model_name = self.model_name
         
-        summary = "\n" + "=" * 70
-        summary += "\n💰 TOTAL COST SUMMARY"
-        summary += "\n" + "=" * 70
-        summary += f"\nTotal Input Tokens: {self.total_input_tokens:,}"
-        summary += f"\nTotal Output Tokens: {self.total_output_tokens:,}"
-        summary += f"\nTotal Tokens: {self.total_tokens:,}"
-        summary += f"\nModel: {model_name}"
-        summary += f"\nEstimated Total Cost: ${total_cost:.4f}"
-        summary += "\n" + "=" * 70
+        parts = [
+            "",
+            "=" * 70,
+            "💰 TOTAL COST SUMMARY",
+            "=" * 70,
+            f"Total Input Tokens: {self.total_input_tokens:,}",
+            f"Total Output Tokens: {self.total_output_tokens:,}",
+            f"Total Tokens: {self.total_tokens:,}",
+            f"Model: {model_name}",
+            f"Estimated Total Cost: ${total_cost:.4f}",
+            "=" * 70,
+        ]
         
-        return summary
\ No newline at end of file
+        return "\n".join(parts)
\ No newline at end of file
@@ -0,0 +1,24 @@
+"""
+Console output helpers for demos that run agents concurrently
+"""
+import io
+import sys
+from contextlib import contextmanager
+
+
+@contextmanager
+def buffered_output():
+    """
+    Collect a demo section's output and write it in one go.
+
+    Sections running on separate threads print into their own buffer, so
+    their lines don't interleave on stdout.
+
+    Yields:
+        io.StringIO: Buffer to pass as print(..., file=out)
+    """
+    out = io.StringIO()
+    try:
+        yield out
+    finally:
+        sys.stdout.write(out.getvalue())
@@ -1,21 +1,23 @@
 """
 Core setup utilities for Strands-Langfuse OTEL integration
 
-This module MUST be imported before any Strands imports to properly configure
-OpenTelemetry export to Langfuse.
+initialize_langfuse_telemetry() MUST run before setup_telemetry() creates the
+OTLP exporter, which reads its endpoint and headers from the environment.
 """
 import os
-import base64
+import binascii
+from functools import lru_cache
 from dotenv import load_dotenv
-from strands.telemetry import StrandsTelemetry
 
 
+@lru_cache(maxsize=1)
 def initialize_langfuse_telemetry():
     """
     Initialize Langfuse OTEL telemetry configuration.
     
-    This function MUST be called before importing Strands Agent to ensure
-    proper OTEL environment variable configuration.
+    This function MUST be called before setup_telemetry(), since the OTLP
+    exporter reads these environment variables when it is created. The result
+    is cached, so .env is read and the auth token encoded only once per process.
     
     Returns:
         tuple: (public_key, secret_key, host) for Langfuse configuration
@@ -33,15 +35,27 @@ def initialize_langfuse_telemetry():
                        "Please ensure LANGFUSE_PUBLIC_KEY, LANGFUSE_SECRET_KEY, "
                        "and LANGFUSE_HOST are set.")
     
-    # Create auth token for OTEL authentication
-    auth_token = base64.b64encode(f"{langfuse_pk}:{langfuse_sk}".encode()).decode()
-    
-    # CRITICAL: Set OTEL environment variables BEFORE importing Strands
+    # CRITICAL: Set OTEL environment variables BEFORE setup_telemetry() creates the exporter
     # Use signal-specific endpoint for traces (not the generic /api/public/otel)
     os.environ["OTEL_EXPORTER_OTLP_TRACES_ENDPOINT"] = f"{langfuse_host}/api/public/otel/v1/traces"
-    os.environ["OTEL_EXPORTER_OTLP_TRACES_HEADERS"] = f"Authorization=Basic {auth_token}"
     os.environ["OTEL_EXPORTER_OTLP_TRACES_PROTOCOL"] = "http/protobuf"
     
+    # Create auth token for OTEL authentication from the current keys. Only on Lambda
+    # is a preset header trusted, since the CloudFormation template builds it from the
+    # same keys; locally a stale header from another project would cause 401s.
+    running_on_lambda = "AWS_LAMBDA_FUNCTION_NAME" in os.environ
+    if not (running_on_lambda and "OTEL_EXPORTER_OTLP_TRACES_HEADERS" in os.environ):
+        auth_token = binascii.b2a_base64(f"{langfuse_pk}:{langfuse_sk}".encode(), newline=False).decode("ascii")
+        os.environ["OTEL_EXPORTER_OTLP_TRACES_HEADERS"] = f"Authorization=Basic {auth_token}"
+
+    # Batch span processor tuning: larger batches, shorter delay and a bounded export
+    # timeout mean fewer POSTs to Langfuse and a faster force_flush() at demo end.
+    # setdefault keeps any values the user already exported.
+    os.environ.setdefault("OTEL_BSP_MAX_QUEUE_SIZE", "8192")
+    os.environ.setdefault("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "2048")
+    os.environ.setdefault("OTEL_BSP_SCHEDULE_DELAY", "1000")
+    os.environ.setdefault("OTEL_BSP_EXPORT_TIMEOUT", "10000")
+
     return langfuse_pk, langfuse_sk, langfuse_host
 
 
@@ -61,6 +75,9 @@ def setup_telemetry(service_name="strands-demo", environment="demo", version="1.
     os.environ["OTEL_SERVICE_NAME"] = service_name
     os.environ["OTEL_RESOURCE_ATTRIBUTES"] = f"service.version={version},deployment.environment={environment}"
     
+    # Imported here so importing core.setup does not load the Strands OTEL stack
+    from strands.telemetry import StrandsTelemetry
+    
     # Initialize telemetry
     print(f"🔧 Initializing StrandsTelemetry for {service_name}...")
     telemetry = StrandsTelemetry()
@@ -70,6 +87,26 @@ def setup_telemetry(service_name="strands-demo", environment="demo", version="1.
     return telemetry
 
 
+def flush_telemetry(telemetry, timeout_millis=5000):
+    """
+    Synchronously export any buffered spans, waiting at most timeout_millis.
+    
+    The provider is flushed rather than shut down so the same telemetry can
+    keep exporting (e.g. across warm Lambda invocations).
+    
+    Args:
+        telemetry: StrandsTelemetry instance returned by setup_telemetry
+        timeout_millis: Upper bound on how long to wait for the export
+        
+    Returns:
+        bool: True if every pending span was exported in time
+    """
+    provider = getattr(telemetry, 'tracer_provider', None)
+    if provider is None or not hasattr(provider, 'force_flush'):
+        return True
+    return provider.force_flush(timeout_millis=timeout_millis)
+
+
 def get_langfuse_client(langfuse_pk=None, langfuse_sk=None, langfuse_host=None):
     """
     Get a configured Langfuse client for scoring and other operations.
@@ -80,15 +117,21 @@ def get_langfuse_client(langfuse_pk=None, langfuse_sk=None, langfuse_host=None):
         langfuse_host: Host URL (optional, will use env var if not provided)
         
     Returns:
-        Langfuse: Configured Langfuse client
+        Langfuse: Configured Langfuse client, shared by callers with the same credentials
     """
-    from langfuse import Langfuse
-    
     # Use provided values or fall back to environment variables
     pk = langfuse_pk or os.environ.get('LANGFUSE_PUBLIC_KEY')
     sk = langfuse_sk or os.environ.get('LANGFUSE_SECRET_KEY')
     host = langfuse_host or os.environ.get('LANGFUSE_HOST')
     
+    return _create_langfuse_client(pk, sk, host)
+
+
+@lru_cache(maxsize=4)
+def _create_langfuse_client(pk, sk, host):
+    """Build one Langfuse client (and its HTTP session) per credential set."""
+    from langfuse import Langfuse
+    
     return Langfuse(
         public_key=pk,
         secret_key=sk,
@@ -5,141 +5,165 @@ This demo shows how to properly integrate Strands agents with Langfuse for obser
 It includes multiple examples showcasing different use cases with proper telemetry setup.
 """
 import uuid
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Tuple, List, Optional
 
-# Initialize OTEL before importing Agent
-from core.setup import initialize_langfuse_telemetry, setup_telemetry
-from core.agent_factory import create_agent
-from core.metrics_formatter import format_dashboard_metrics, TokenAggregator
+# OTEL is configured in run_demo, before any agent is created
+from core.setup import initialize_langfuse_telemetry, setup_telemetry, flush_telemetry
+from core.agent_factory import create_agent, get_model_id
+from core.metrics_formatter import format_and_accumulate, TokenAggregator
+from core.output import buffered_output
 
-# Initialize Langfuse OTEL
-langfuse_pk, langfuse_sk, langfuse_host = initialize_langfuse_telemetry()
+# Separator lines, built once
+_RULE = "-" * 70
+_DOUBLE_RULE = "=" * 70
+_SHORT_RULE = "-" * 50
+
+# Constant tag prefixes; each demo appends its run-scoped tag
+_SIMPLE_CHAT_TAGS = ("strands-demo", "simple-chat")
+_MULTI_TURN_TAGS = ("strands-demo", "multi-turn")
+_CALCULATOR_TAGS = ("strands-demo", "calculator")
+_CREATIVE_TAGS = ("strands-demo", "creative")
 
 
 def demo_simple_chat(run_id: str, aggregator: TokenAggregator) -> str:
     """Example 1: Simple single-turn chat"""
-    print("\n📝 Example 1: Simple Chat")
-    print("-" * 50)
-    
-    agent = create_agent(
-        system_prompt="You are a helpful assistant. Be concise in your responses.",
-        session_id=f"demo-simple-chat-{run_id}",
-        user_id="demo-user",
-        tags=["strands-demo", "simple-chat", f"run-{run_id}"]
-    )
-    
-    query = "What is the capital of France?"
-    print(f"Query: {query}")
-    
-    response = agent(query)
-    print(f"Response: {response}")
-    
-    print(format_dashboard_metrics(response, trace_id=f"simple-chat-{run_id}"))
-    aggregator.add_response(response, "Simple Chat")
-    
-    print("-" * 70)
-    
-    return f"simple-chat-{run_id}"
+    # Built once; used for the dashboard trace IDs and the return value
+    trace_key = f"simple-chat-{run_id}"
+    with buffered_output() as out:
+        print("\n📝 Example 1: Simple Chat", file=out)
+        print(_SHORT_RULE, file=out)
+        
+        agent = create_agent(
+            system_prompt="You are a helpful assistant. Be concise in your responses.",
+            session_id=f"demo-simple-chat-{run_id}",
+            user_id="demo-user",
+            tags=(*_SIMPLE_CHAT_TAGS, f"run-{run_id}"),
+            callback_handler=None
+        )
+        model_id = get_model_id(agent)
+        
+        query = "What is the capital of France?"
+        print(f"Query: {query}", file=out)
+        
+        response = agent(query)
+        print(f"Response: {response}", file=out)
+        
+        print(format_and_accumulate(response, aggregator, "Simple Chat", trace_id=trace_key, model_id=model_id), file=out)
+        
+        print(_RULE, file=out)
+        
+        return trace_key
 
 
 def demo_multi_turn_conversation(run_id: str, aggregator: TokenAggregator) -> str:
     """Example 2: Multi-turn conversation with context"""
-    print("\n💬 Example 2: Multi-turn Conversation")
-    print("-" * 50)
-    
-    agent = create_agent(
-        system_prompt="You are an enthusiastic oceanographer who loves sharing fascinating facts about ocean waves. Remember our conversation context.",
-        session_id=f"demo-multi-turn-{run_id}",
-        user_id="demo-user",
-        tags=["strands-demo", "multi-turn", f"run-{run_id}"]
-    )
-    
-    # First turn
-    query1 = "How powerful can ocean waves get? What's the most powerful wave ever recorded?"
-    print(f"Turn 1 - Query: {query1}")
-    response1 = agent(query1)
-    print(f"Turn 1 - Response: {str(response1)[:100]}...\n")
-    
-    print(format_dashboard_metrics(response1, trace_id=f"multi-turn-{run_id}-turn1"))
-    aggregator.add_response(response1, "Multi-turn Q1")
-    
-    print("-" * 70)
-    
-    # Second turn (references first)
-    query2 = "That's incredible! How tall was the biggest wave ever recorded?"
-    print(f"\nTurn 2 - Query: {query2}")
-    response2 = agent(query2)
-    print(f"Turn 2 - Response: {response2}")
-    
-    print(format_dashboard_metrics(response2, trace_id=f"multi-turn-{run_id}-turn2"))
-    aggregator.add_response(response2, "Multi-turn Q2")
-    
-    print("-" * 70)
-    
-    return f"multi-turn-{run_id}"
+    # Built once; used for the dashboard trace IDs and the return value
+    trace_key = f"multi-turn-{run_id}"
+    with buffered_output() as out:
+        print("\n💬 Example 2: Multi-turn Conversation", file=out)
+        print(_SHORT_RULE, file=out)
+        
+        agent = create_agent(
+            system_prompt="You are an enthusiastic oceanographer who loves sharing fascinating facts about ocean waves. Remember our conversation context.",
+            session_id=f"demo-multi-turn-{run_id}",
+            user_id="demo-user",
+            tags=(*_MULTI_TURN_TAGS, f"run-{run_id}"),
+            callback_handler=None
+        )
+        model_id = get_model_id(agent)
+        
+        # First turn
+        query1 = "How powerful can ocean waves get? What's the most powerful wave ever recorded?"
+        print(f"Turn 1 - Query: {query1}", file=out)
+        response1 = agent(query1)
+        response1_text = str(response1)
+        print(f"Turn 1 - Response: {response1_text[:100]}...\n", file=out)
+        
+        print(format_and_accumulate(response1, aggregator, "Multi-turn Q1", trace_id=f"{trace_key}-turn1", model_id=model_id), file=out)
+        
+        print(_RULE, file=out)
+        
+        # Second turn (references first)
+        query2 = "That's incredible! How tall was the biggest wave ever recorded?"
+        print(f"\nTurn 2 - Query: {query2}", file=out)
+        response2 = agent(query2)
+        print(f"Turn 2 - Response: {response2}", file=out)
+        
+        print(format_and_accumulate(response2, aggregator, "Multi-turn Q2", trace_id=f"{trace_key}-turn2", model_id=model_id), file=out)
+        
+        print(_RULE, file=out)
+        
+        return trace_key
 
 
 def demo_task_specific_agent(run_id: str, aggregator: TokenAggregator) -> str:
     """Example 3: Task-specific agent (calculator)"""
-    print("\n🧮 Example 3: Task-Specific Agent (Calculator)")
-    print("-" * 50)
-    
-    agent = create_agent(
-        system_prompt="You are a calculator. Output only the numerical result, nothing else.",
-        session_id=f"demo-calculator-{run_id}",
-        user_id="demo-user",
-        tags=["strands-demo", "calculator", f"run-{run_id}"]
-    )
-    
-    calculations = [
-        "25 * 4",
-        "sqrt(144)",
-        "15% of 200"
-    ]
-    
-    for calc in calculations:
-        print(f"Calculate: {calc}")
-        result = agent(calc)
-        print(f"Result: {result}")
+    # Built once; used for the dashboard trace IDs and the return value
+    trace_key = f"calculator-{run_id}"
+    with buffered_output() as out:
+        print("\n🧮 Example 3: Task-Specific Agent (Calculator)", file=out)
+        print(_SHORT_RULE, file=out)
         
-        calc_idx = calculations.index(calc)
-        print(format_dashboard_metrics(result, trace_id=f"calculator-{run_id}-calc{calc_idx+1}"))
-        aggregator.add_response(result, f"Calculator: {calc}")
+        agent = create_agent(
+            system_prompt="You are a calculator. Output only the numerical result, nothing else.",
+            session_id=f"demo-calculator-{run_id}",
+            user_id="demo-user",
+            tags=(*_CALCULATOR_TAGS, f"run-{run_id}"),
+            callback_handler=None
+        )
+        model_id = get_model_id(agent)
         
-        if calc != calculations[-1]:  # Don't print separator after last calculation
-            print("")
-    
-    print("-" * 70)
-    
-    return f"calculator-{run_id}"
+        calculations = [
+            "25 * 4",
+            "sqrt(144)",
+            "15% of 200"
+        ]
+        
+        for calc_idx, calc in enumerate(calculations, 1):
+            print(f"Calculate: {calc}", file=out)
+            result = agent(calc)
+            print(f"Result: {result}", file=out)
+            
+            print(format_and_accumulate(result, aggregator, f"Calculator: {calc}", trace_id=f"{trace_key}-calc{calc_idx}", model_id=model_id), file=out)
+            
+            if calc_idx < len(calculations):  # Don't print separator after last calculation
+                print("", file=out)
+        
+        print(_RULE, file=out)
+        
+        return trace_key
 
 
 def demo_creative_writing(run_id: str, aggregator: TokenAggregator) -> str:
     """Example 4: Creative writing agent"""
-    print("\n✍️ Example 4: Creative Writing Agent")
-    print("-" * 50)
-    
-    agent = create_agent(
-        system_prompt="You are a creative writer. Write a short, engaging haiku about the given topic.",
-        session_id=f"demo-creative-{run_id}",
-        user_id="demo-user",
-        tags=["strands-demo", "creative", f"run-{run_id}"]
-    )
-    
-    topic = "artificial intelligence"
-    print(f"Topic: {topic}")
-    
-    haiku = agent(f"Write a haiku about {topic}")
-    print(f"Haiku:\n{haiku}")
-    
-    print(format_dashboard_metrics(haiku, trace_id=f"creative-{run_id}"))
-    aggregator.add_response(haiku, "Creative Writing")
-    
-    print("-" * 70)
-    
-    return f"creative-{run_id}"
+    # Built once; used for the dashboard trace IDs and the return value
+    trace_key = f"creative-{run_id}"
+    with buffered_output() as out:
+        print("\n✍️ Example 4: Creative Writing Agent", file=out)
+        print(_SHORT_RULE, file=out)
+        
+        agent = create_agent(
+            system_prompt="You are a creative writer. Write a short, engaging haiku about the given topic.",
+            session_id=f"demo-creative-{run_id}",
+            user_id="demo-user",
+            tags=(*_CREATIVE_TAGS, f"run-{run_id}"),
+            callback_handler=None
+        )
+        model_id = get_model_id(agent)
+        
+        topic = "artificial intelligence"
+        print(f"Topic: {topic}", file=out)
+        
+        haiku = agent(f"Write a haiku about {topic}")
+        print(f"Haiku:\n{haiku}", file=out)
+        
+        print(format_and_accumulate(haiku, aggregator, "Creative Writing", trace_id=trace_key, model_id=model_id), file=out)
+        
+        print(_RULE, file=out)
+        
+        return trace_key
 
 
 def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
@@ -152,6 +176,9 @@ def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
     Returns:
         Tuple of (session_id, trace_ids)
     """
+    # Initialize Langfuse OTEL on first run rather than at import (cached after that)
+    langfuse_pk, langfuse_sk, langfuse_host = initialize_langfuse_telemetry()
+    
     # Setup telemetry
     telemetry = setup_telemetry("strands-langfuse-demo")
     
@@ -159,15 +186,15 @@ def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
     aggregator = TokenAggregator()
     
     print("\n🚀 Strands Agents + Langfuse Integration Demo")
-    print("=" * 70)
+    print(_DOUBLE_RULE)
     print(f"📊 Langfuse host: {langfuse_host}")
     
     # Generate unique run ID for this execution
-    run_id = str(uuid.uuid4())[:8]
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    run_id = uuid.uuid4().hex[:8]
+    timestamp = f"{datetime.now():%Y%m%d-%H%M%S}"
     print(f"🎨 Run ID: {run_id}")
     print(f"⏰ Timestamp: {timestamp}")
-    print("=" * 70)
+    print(_DOUBLE_RULE)
     
     # If session_id provided, use it as the main session
     if not session_id:
@@ -184,30 +211,28 @@ def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
             demo_creative_writing
         ]
         
-        for demo in demos:
-            demo_session = demo(run_id, aggregator)
-            trace_ids.append(demo_session)
-            time.sleep(1)  # Small delay between demos
+        # Demos use separate agents and sessions, so run them concurrently;
+        # each agent call opens its own root span, keeping traces separate
+        with ThreadPoolExecutor(max_workers=len(demos)) as executor:
+            futures = [executor.submit(demo, run_id, aggregator) for demo in demos]
+            trace_ids.extend(future.result() for future in futures)
         
-        # Force flush telemetry to ensure all traces are sent
+        # Force flush telemetry to ensure all traces are sent; returns once exported
         print("\n🔄 Flushing telemetry...")
-        if hasattr(telemetry, 'tracer_provider') and hasattr(telemetry.tracer_provider, 'force_flush'):
-            telemetry.tracer_provider.force_flush()
-        
-        # Give Langfuse time to process traces
-        print("⏳ Waiting for traces to be processed...")
-        time.sleep(3)
-        
-        print("\n✅ All demos completed successfully!")
-        
-        # Display total cost summary with traces info
-        print(aggregator.format_total_cost())
-        print(f"\n📊 Traces sent to Langfuse: {len(trace_ids)}")
+        flush_telemetry(telemetry)
         
-        print(f"\n🔍 View your traces in Langfuse:")
-        print(f"   URL: {langfuse_host}")
-        print(f"   Filter by run ID: {run_id}")
-        print(f"   Filter by tags: strands-demo, run-{run_id}")
+        # Write the closing summary in one go, like the demo sections above
+        with buffered_output() as out:
+            print("\n✅ All demos completed successfully!", file=out)
+            
+            # Display total cost summary with traces info
+            print(aggregator.format_total_cost(), file=out)
+            print(f"\n📊 Traces sent to Langfuse: {len(trace_ids)}", file=out)
+            
+            print(f"\n🔍 View your traces in Langfuse:", file=out)
+            print(f"   URL: {langfuse_host}", file=out)
+            print(f"   Filter by run ID: {run_id}", file=out)
+            print(f"   Filter by tags: strands-demo, run-{run_id}", file=out)
         
         # Prepare metrics for return
         metrics = {
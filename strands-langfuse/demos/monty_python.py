@@ -8,172 +8,215 @@ This example demonstrates:
 - Fun Monty Python themed interactions
 - Rich trace attributes for better observability
 """
-import time
+import io
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, List, Optional
 
-# Initialize OTEL before importing Agent
-from core.setup import initialize_langfuse_telemetry, setup_telemetry
-from core.agent_factory import create_agent
-from core.metrics_formatter import format_dashboard_metrics, TokenAggregator
+# OTEL is configured in run_demo, before any agent is created
+from core.setup import initialize_langfuse_telemetry, setup_telemetry, flush_telemetry
+from core.agent_factory import create_agent, get_model_id
+from core.metrics_formatter import format_and_accumulate, TokenAggregator
 
-# Initialize Langfuse OTEL
-langfuse_pk, langfuse_sk, langfuse_host = initialize_langfuse_telemetry()
+# Separator lines, built once
+_RULE = "-" * 70
+_DOUBLE_RULE = "=" * 70
+_MEDIUM_RULE = "-" * 60
 
+# Tags for each question's agent
+_SWALLOW_TAGS = ("monty-python", "bridge-of-death", "swallow-question")
+_FAVORITE_COLOR_TAGS = ("monty-python", "bridge-of-death", "favorite-color")
+_GRAIL_TAGS = ("monty-python", "holy-grail", "quest-wisdom")
+_INQUISITION_TAGS = ("monty-python", "spanish-inquisition", "programming-humor")
 
-def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
-    """
-    Run the Monty Python themed demo with the provided or generated session ID.
-    
-    Args:
-        session_id: Optional session ID (will generate if not provided)
-        
-    Returns:
-        Tuple of (session_id, trace_ids)
-    """
-    # Setup telemetry
-    telemetry = setup_telemetry("strands-monty-python-demo")
-    
-    # Initialize token aggregator for cost tracking
-    aggregator = TokenAggregator()
-    
-    print("🦜 Strands Agents + Langfuse Demo: Monty Python Edition\n")
-    
-    print(f"📡 Sending traces to Langfuse at: {langfuse_host}")
-    print(f"🔑 Using public key: {langfuse_pk[:20]}...")
-    print()
-    
-    # Use provided session_id or generate a default one
-    if not session_id:
-        session_id = "holy-grail-quest"
-    
-    trace_ids = []
-    
-    # Create the main agent with fun trace attributes
-    print("🏰 Approaching the Bridge of Death...")
-    print("👴 Bridgekeeper: STOP! He who would cross the Bridge of Death")
-    print("                 Must answer me these questions three!")
-    print("\n🤴 King Arthur: Very well, I shall consult my AI assistant...")
-    print("-" * 60)
-    
+
+def _bridge_swallow_questions(session_id: str, aggregator: TokenAggregator) -> Tuple[List[str], str]:
+    """Questions 1 and 2: one agent, so the follow-up keeps the first answer as context"""
+    out = io.StringIO()
     # Question 1: The famous swallow question
-    print("\n" + "-" * 70)
-    print("❓ QUESTION 1: What is the airspeed velocity of an unladen swallow?")
-    print("-" * 70)
+    print("\n" + _RULE, file=out)
+    print("❓ QUESTION 1: What is the airspeed velocity of an unladen swallow?", file=out)
+    print(_RULE, file=out)
     
     agent1 = create_agent(
         system_prompt="You are a medieval scholar well-versed in ornithology and Monty Python references. Be helpful but also acknowledge the humor in the questions.",
         session_id=session_id,
         user_id="king-arthur",
-        tags=["monty-python", "bridge-of-death", "swallow-question"],
+        tags=_SWALLOW_TAGS,
+        callback_handler=None,
         **{
             "quest.type": "bridge-crossing",
             "question.number": "1"
         }
     )
+    agent1_model_id = get_model_id(agent1)
     
     response1 = agent1("What is the airspeed velocity of an unladen swallow?")
-    print(f"\n🤖 AI Scholar: {response1}")
+    print(f"\n🤖 AI Scholar: {response1}", file=out)
     
-    print(format_dashboard_metrics(response1, trace_id=f"{session_id}-q1"))
-    aggregator.add_response(response1, "Swallow Question")
+    print(format_and_accumulate(response1, aggregator, "Swallow Question", trace_id=f"{session_id}-q1", model_id=agent1_model_id), file=out)
     
-    print("-" * 70)
-    trace_ids.append(f"{session_id}-q1")
+    print(_RULE, file=out)
     
     # Question 2: The follow-up trick question
-    print("\n" + "-" * 70)
-    print("❓ QUESTION 2: But wait, African or European swallow?")
-    print("-" * 70)
+    print("\n" + _RULE, file=out)
+    print("❓ QUESTION 2: But wait, African or European swallow?", file=out)
+    print(_RULE, file=out)
     
     # Update trace attributes for the second question
     agent1.trace_attributes["question.number"] = "2"
     agent1.trace_attributes["difficulty"] = "trick-question"
     
     response2 = agent1("But wait, African or European swallow?")
-    print(f"\n🤖 AI Scholar: {response2}")
+    print(f"\n🤖 AI Scholar: {response2}", file=out)
     
-    print(format_dashboard_metrics(response2, trace_id=f"{session_id}-q2"))
-    aggregator.add_response(response2, "African or European")
+    print(format_and_accumulate(response2, aggregator, "African or European", trace_id=f"{session_id}-q2", model_id=agent1_model_id), file=out)
     
-    print("-" * 70)
-    trace_ids.append(f"{session_id}-q2")
-    
-    # Question 3: Favorite color
-    print("\n" + "-" * 70)
-    print("❓ QUESTION 3: What is your favorite color?")
-    print("-" * 70)
+    print(_RULE, file=out)
+    return [f"{session_id}-q1", f"{session_id}-q2"], out.getvalue()
+
+
+def _bridge_favorite_color(session_id: str, aggregator: TokenAggregator) -> Tuple[List[str], str]:
+    """Question 3: Favorite color"""
+    out = io.StringIO()
+    print("\n" + _RULE, file=out)
+    print("❓ QUESTION 3: What is your favorite color?", file=out)
+    print(_RULE, file=out)
     
     agent2 = create_agent(
         system_prompt="You are King Arthur's AI assistant. Answer as if you were helping King Arthur cross the Bridge of Death. Be decisive about color choices.",
         session_id=session_id,
         user_id="king-arthur",
-        tags=["monty-python", "bridge-of-death", "favorite-color"],
+        tags=_FAVORITE_COLOR_TAGS,
+        callback_handler=None,
         **{
             "question.number": "3",
             "favorite.color": "blue"  # The correct answer!
         }
     )
+    agent2_model_id = get_model_id(agent2)
     
     response3 = agent2("What is your favorite color?")
-    print(f"\n🤖 AI Assistant: {response3}")
+    print(f"\n🤖 AI Assistant: {response3}", file=out)
     
-    print(format_dashboard_metrics(response3, trace_id=f"{session_id}-q3"))
-    aggregator.add_response(response3, "Favorite Color")
+    print(format_and_accumulate(response3, aggregator, "Favorite Color", trace_id=f"{session_id}-q3", model_id=agent2_model_id), file=out)
     
-    print("-" * 70)
-    trace_ids.append(f"{session_id}-q3")
-    
-    # Bonus: The Holy Grail quest
-    print("\n" + "-" * 70)
-    print("🏆 BONUS ROUND: What is the secret to finding the Holy Grail?")
-    print("-" * 70)
+    print(_RULE, file=out)
+    return [f"{session_id}-q3"], out.getvalue()
+
+
+def _holy_grail_secret(session_id: str, aggregator: TokenAggregator) -> Tuple[List[str], str]:
+    """Bonus: The Holy Grail quest"""
+    out = io.StringIO()
+    print("\n" + _RULE, file=out)
+    print("🏆 BONUS ROUND: What is the secret to finding the Holy Grail?", file=out)
+    print(_RULE, file=out)
     
     agent3 = create_agent(
         system_prompt="You are a wise sage who knows about medieval quests and Monty Python humor. Be mystical yet funny.",
         session_id=f"{session_id}-bonus",
         user_id="king-arthur",
-        tags=["monty-python", "holy-grail", "quest-wisdom"],
+        tags=_GRAIL_TAGS,
+        callback_handler=None,
         **{"quest.type": "grail-seeking"}
     )
+    agent3_model_id = get_model_id(agent3)
     
     response4 = agent3("What is the secret to finding the Holy Grail?")
-    print(f"\n🤖 Wise Sage: {response4}")
-    
-    print(format_dashboard_metrics(response4, trace_id=f"{session_id}-bonus"))
-    aggregator.add_response(response4, "Holy Grail Secret")
+    print(f"\n🤖 Wise Sage: {response4}", file=out)
     
-    print("-" * 70)
-    trace_ids.append(f"{session_id}-bonus")
+    print(format_and_accumulate(response4, aggregator, "Holy Grail Secret", trace_id=f"{session_id}-bonus", model_id=agent3_model_id), file=out)
     
-    # The Spanish Inquisition
-    print("\n" + "-" * 70)
-    print("⚔️ NOBODY EXPECTS... THE SPANISH INQUISITION!")
-    print("What are the chief weapons of a Python developer?")
-    print("-" * 70)
+    print(_RULE, file=out)
+    return [f"{session_id}-bonus"], out.getvalue()
+
+
+def _spanish_inquisition(session_id: str, aggregator: TokenAggregator) -> Tuple[List[str], str]:
+    """The Spanish Inquisition (runs in its own session)"""
+    out = io.StringIO()
+    print("\n" + _RULE, file=out)
+    print("⚔️ NOBODY EXPECTS... THE SPANISH INQUISITION!", file=out)
+    print("What are the chief weapons of a Python developer?", file=out)
+    print(_RULE, file=out)
     
     agent4 = create_agent(
         system_prompt="You are a Python (the programming language) assistant who also loves Monty Python. Make programming jokes related to the Spanish Inquisition sketch. Be creative and funny!",
         session_id="spanish-inquisition",
         user_id="python-developer",
-        tags=["monty-python", "spanish-inquisition", "programming-humor"],
+        tags=_INQUISITION_TAGS,
+        callback_handler=None,
         **{
             "unexpected": True,
             "chief.weapons": ["surprise", "fear", "ruthless efficiency"]
         }
     )
+    agent4_model_id = get_model_id(agent4)
     
     response5 = agent4("What are the chief weapons of a Python developer?")
-    print(f"\n🤖 Python Assistant: {response5}")
+    print(f"\n🤖 Python Assistant: {response5}", file=out)
+    
+    print(format_and_accumulate(response5, aggregator, "Spanish Inquisition", trace_id="spanish-inquisition", model_id=agent4_model_id), file=out)
+    
+    print(_RULE, file=out)
+    return ["spanish-inquisition"], out.getvalue()
+
+
+def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
+    """
+    Run the Monty Python themed demo with the provided or generated session ID.
+    
+    Args:
+        session_id: Optional session ID (will generate if not provided)
+        
+    Returns:
+        Tuple of (session_id, trace_ids)
+    """
+    # Initialize Langfuse OTEL on first run rather than at import (cached after that)
+    langfuse_pk, langfuse_sk, langfuse_host = initialize_langfuse_telemetry()
+    
+    # Setup telemetry
+    telemetry = setup_telemetry("strands-monty-python-demo")
+    
+    # Initialize token aggregator for cost tracking
+    aggregator = TokenAggregator()
+    
+    print("🦜 Strands Agents + Langfuse Demo: Monty Python Edition\n")
+    
+    print(f"📡 Sending traces to Langfuse at: {langfuse_host}")
+    print(f"🔑 Using public key: {langfuse_pk[:20]}...")
+    print()
     
-    print(format_dashboard_metrics(response5, trace_id="spanish-inquisition"))
-    aggregator.add_response(response5, "Spanish Inquisition")
+    # Use provided session_id or generate a default one
+    if not session_id:
+        session_id = "holy-grail-quest"
     
-    print("-" * 70)
-    trace_ids.append("spanish-inquisition")
+    trace_ids = []
     
-    print("\n" + "=" * 70)
+    # Create the main agent with fun trace attributes
+    print("🏰 Approaching the Bridge of Death...")
+    print("👴 Bridgekeeper: STOP! He who would cross the Bridge of Death")
+    print("                 Must answer me these questions three!")
+    print("\n🤴 King Arthur: Very well, I shall consult my AI assistant...")
+    print(_MEDIUM_RULE)
+    
+    # The scenes use separate agents, so ask them concurrently; Bedrock calls are
+    # network-bound and the shared model's client is thread-safe. Each scene
+    # returns its output, which is printed in story order.
+    scenes = [
+        _bridge_swallow_questions,
+        _bridge_favorite_color,
+        _holy_grail_secret,
+        _spanish_inquisition
+    ]
+    with ThreadPoolExecutor(max_workers=len(scenes)) as executor:
+        futures = [executor.submit(scene, session_id, aggregator) for scene in scenes]
+        for future in futures:
+            scene_trace_ids, scene_output = future.result()
+            trace_ids.extend(scene_trace_ids)
+            print(scene_output, end="")
+    
+    print("\n" + _DOUBLE_RULE)
     print("✅ KING ARTHUR SUCCESSFULLY CROSSES THE BRIDGE!")
-    print("=" * 70)
+    print(_DOUBLE_RULE)
     
     print("\n🎬 THE END")
     
@@ -185,7 +228,7 @@ def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
     print(cost_summary)
     print(f"\n📊 Traces sent to Langfuse: {len(trace_ids)}")
     
-    print("\n" + "=" * 70)
+    print("\n" + _DOUBLE_RULE)
     
     print(f"\n✨ All traces sent to Langfuse! Check your dashboard at: {langfuse_host}")
     print("   Look for traces tagged with 'monty-python' and various session IDs")
@@ -193,14 +236,9 @@ def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
     print(f"   - '{session_id}-bonus' for the grail wisdom")
     print("   - 'spanish-inquisition' for the Python humor")
     
-    # Force flush telemetry to ensure all traces are sent
+    # Force flush telemetry to ensure all traces are sent; returns once exported
     print("\n🔄 Flushing telemetry...")
-    if hasattr(telemetry, 'tracer_provider') and hasattr(telemetry.tracer_provider, 'force_flush'):
-        telemetry.tracer_provider.force_flush()
-    
-    # Give Langfuse time to process traces
-    print("⏳ Waiting for traces to be processed...")
-    time.sleep(3)
+    flush_telemetry(telemetry)
     
     print("\n✅ Done! Your traces should now be visible in Langfuse.")
     
@@ -5,17 +5,29 @@ This demo showcases how to automatically score AWS Strands agents responses usin
 Langfuse's scoring capabilities. It tests various scenarios where agents should give
 correct or incorrect answers, then scores their responses programmatically.
 """
+import io
 import os
 import sys
 import json
 import time
 import hashlib
+import re
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List, Tuple, Optional
+from functools import lru_cache, partial
+from typing import Callable, Dict, Any, List, Tuple, Optional
+
+import requests
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Initialize OTEL before importing Agent
-from core.setup import initialize_langfuse_telemetry, setup_telemetry, get_langfuse_client
-from core.agent_factory import create_agent
+from core.setup import initialize_langfuse_telemetry, setup_telemetry, get_langfuse_client, flush_telemetry
+from core.agent_factory import create_agent, get_model_id
 from core.metrics_formatter import format_dashboard_metrics, TokenAggregator
 
 # Initialize Langfuse OTEL
@@ -84,19 +96,30 @@ TEST_CASES = [
 ]
 
 
+# Isolated numbers, or numbers followed by punctuation
+_NUMBER_RE = re.compile(r'\b(-?\d+\.?\d*)\b(?:[.,!?\s]|$)')
+
+
 def extract_number_from_response(response: str) -> str:
     """Extract number from a response string"""
-    import re
-    # Look for numbers in the response
-    numbers = re.findall(r'\b(-?\d+\.?\d*)\b(?:[.,!?\s]|$)', response)
     # Return the last number found (usually the answer)
-    return numbers[-1] if numbers else ""
+    last = ""
+    for match in _NUMBER_RE.finditer(response):
+        last = match.group(1)
+    return last
+
+
+@lru_cache(maxsize=32)
+def _expected_number(expected: str) -> str:
+    """Number in an expected answer; TEST_CASES only has a handful, so cache them."""
+    return extract_number_from_response(expected)
 
 
-def score_exact_match(response: str, expected: str) -> Dict[str, Any]:
-    """Score based on exact match"""
+def score_exact_match(response: str, expected: str, expected_clean: Optional[str] = None) -> Dict[str, Any]:
+    """Score based on exact match (expected_clean may be passed in pre-normalized)"""
     response_clean = response.strip().lower()
-    expected_clean = expected.strip().lower()
+    if expected_clean is None:
+        expected_clean = expected.strip().lower()
     
     # Direct match
     if expected_clean in response_clean:
@@ -107,7 +130,7 @@ def score_exact_match(response: str, expected: str) -> Dict[str, Any]:
     
     # For numbers, extract and compare
     response_num = extract_number_from_response(response)
-    expected_num = extract_number_from_response(expected)
+    expected_num = _expected_number(expected)
     
     if response_num and expected_num and response_num == expected_num:
         return {
@@ -121,28 +144,60 @@ def score_exact_match(response: str, expected: str) -> Dict[str, Any]:
     }
 
 
+# Phrases that put a keyword in a negative context, matched in one pass
+NEGATIVE_PATTERNS = (
+    "who needs", "not", "isn't", "wasn't", "instead of", "rather than",
+    "forget", "wrong", "incorrect", "false"
+)
+_NEGATIVE_RE = re.compile("|".join(map(re.escape, NEGATIVE_PATTERNS)))
+
+
+@lru_cache(maxsize=32)
+def _keyword_scanner(keywords: Tuple[str, ...]) -> Tuple["re.Pattern[str]", Dict[str, Tuple[str, ...]]]:
+    """
+    Compile one pattern that finds every keyword in a single pass over a response.
+    
+    Returns the pattern and, for each keyword, the keywords that are prefixes of it.
+    """
+    unique = sorted(set(keywords), key=len, reverse=True)
+    # A lookahead capture reports overlapping hits; longer keywords go first so they win ties
+    alternation = "|".join(map(re.escape, unique))
+    # Any keyword matching at a position is a prefix of the longest one matching there
+    prefixes = {k: tuple(p for p in unique if k.startswith(p)) for k in unique}
+    return re.compile(f"(?=({alternation}))"), prefixes
+
+
+def _first_keyword_positions(text: str, keywords: Tuple[str, ...]) -> Dict[str, int]:
+    """Map each keyword found in text to the index of its first occurrence."""
+    if not keywords:
+        return {}
+    scanner, prefixes = _keyword_scanner(keywords)
+    positions = {}
+    for match in scanner.finditer(text):
+        # Record the prefix keywords too, so ("new york", "new") both count
+        for keyword in prefixes[match.group(1)]:
+            positions.setdefault(keyword, match.start())
+    return positions
+
+
 def score_keyword_match(response: str, required_keywords: List[str]) -> Dict[str, Any]:
     """Score based on presence of required keywords as the actual answer"""
     response_lower = response.lower()
     found = []
     missing = []
     
-    # Check for negative context around keywords
-    negative_patterns = [
-        "who needs", "not", "isn't", "wasn't", "instead of", "rather than",
-        "forget", "wrong", "incorrect", "false"
-    ]
+    # Locate every keyword once; the position is reused for the negative-context check
+    keywords_lower = tuple(keyword.lower() for keyword in required_keywords)
+    positions = _first_keyword_positions(response_lower, keywords_lower)
     
-    for keyword in required_keywords:
-        keyword_lower = keyword.lower()
-        if keyword_lower in response_lower:
+    for keyword, keyword_lower in zip(required_keywords, keywords_lower):
+        keyword_pos = positions.get(keyword_lower)
+        if keyword_pos is not None:
             # Check if the keyword is in a negative context
-            keyword_pos = response_lower.find(keyword_lower)
             context_start = max(0, keyword_pos - 50)
-            context = response_lower[context_start:keyword_pos]
             
-            # Check if any negative patterns appear before the keyword
-            is_negative = any(neg in context for neg in negative_patterns)
+            # Check if any negative patterns appear in the 50 characters before the keyword
+            is_negative = _NEGATIVE_RE.search(response_lower, context_start, keyword_pos) is not None
             
             # Also check if the response explicitly states a different answer
             if "buzz lightyear" in response_lower and keyword_lower == "neil armstrong":
@@ -169,82 +224,224 @@ def score_keyword_match(response: str, required_keywords: List[str]) -> Dict[str
     }
 
 
-def evaluate_response(response: str, test_case: Dict[str, Any]) -> Dict[str, Any]:
-    """Evaluate a response based on the test case scoring method"""
+def _make_scorer(test_case: Dict[str, Any]) -> Callable[[str], Dict[str, Any]]:
+    """Bind a test case's fixed inputs once, so scoring a response skips the method dispatch"""
     method = test_case["scoring_method"]
     
     if method == "exact_match":
-        return score_exact_match(response, test_case["expected_answer"])
+        expected = test_case["expected_answer"]
+        return partial(score_exact_match, expected=expected, expected_clean=expected.strip().lower())
     elif method == "keyword_match":
-        return score_keyword_match(response, test_case.get("required_keywords", []))
+        return partial(score_keyword_match, required_keywords=tuple(test_case.get("required_keywords", ())))
     else:
-        return {"score": 0.5, "reasoning": f"Unknown scoring method: {method}"}
+        result = {"score": 0.5, "reasoning": f"Unknown scoring method: {method}"}
+        return lambda response: dict(result)
+
+
+# Scorers for the fixed TEST_CASES, built once at import
+_SCORERS = {test_case["name"]: _make_scorer(test_case) for test_case in TEST_CASES}
+
+
+def evaluate_response(response: str, test_case: Dict[str, Any]) -> Dict[str, Any]:
+    """Evaluate a response based on the test case scoring method"""
+    scorer = _SCORERS.get(test_case["name"]) or _make_scorer(test_case)
+    return scorer(response)
 
 
-def find_trace_for_test(session_id: str, test_case_name: str, max_retries: int = 5):
-    """Find the trace for a specific test case using Langfuse API"""
-    # Wait for trace to be processed
-    time.sleep(3)
+def _trace_test_names(trace: Dict[str, Any], session_id: str) -> List[str]:
+    """Return every test case name a trace is tagged with or attributed to."""
+    # Check tags in the trace
+    trace_tags = trace.get("tags", [])
+    # Also check metadata.attributes.langfuse.tags
+    metadata = trace.get("metadata", {})
+    attributes = metadata.get("attributes", {})
+    attr_tags = attributes.get("langfuse.tags", [])
+    
+    # Parse attr_tags if it's a JSON string
+    if isinstance(attr_tags, str):
+        try:
+            attr_tags = json.loads(attr_tags)
+        except ValueError:
+            attr_tags = []
+    
+    names = trace_tags + attr_tags
+    
+    # Also check session ID
+    if attributes.get("session.id") == session_id and attributes.get("test.name"):
+        names.append(attributes["test.name"])
+    
+    return names
+
+
+def fetch_traces_by_test(session_id: str, test_names: List[str], max_retries: int = 10) -> Dict[str, str]:
+    """
+    Find the trace for every test case with one Langfuse query per attempt.
+    
+    Args:
+        session_id: Session the scoring run used
+        test_names: Test case names to look up
+        max_retries: Attempts before giving up on traces that have not been indexed yet;
+                     waits between attempts back off from 0.25s up to 4s
+        
+    Returns:
+        Dict mapping test case name to its most recent trace ID
+    """
+    # Create auth header
+    auth = b64encode(f"{langfuse_pk}:{langfuse_sk}".encode()).decode()
+    headers = {"Authorization": f"Basic {auth}"}
+    
+    # All scoring traces share the strands-scoring tag and this run's session,
+    # so one query covers every test without picking up earlier runs
+    url = f"{langfuse_host}/api/public/traces"
+    params = {
+        "tags": ["strands-scoring"],
+        "sessionId": session_id,
+        "limit": 100,
+        "orderBy": "timestamp.desc"
+    }
+    
+    wanted = set(test_names)
+    trace_by_name = {}
+    delay = 0.25
     
     for retry in range(max_retries):
         try:
-            # Use the API directly via requests
-            import requests
-            from base64 import b64encode
-            
-            # Create auth header
-            auth = b64encode(f"{langfuse_pk}:{langfuse_sk}".encode()).decode()
-            headers = {"Authorization": f"Basic {auth}"}
-            
-            # Query traces with tags
-            url = f"{langfuse_host}/api/public/traces"
-            params = {
-                "tags": ["strands-scoring", test_case_name],
-                "limit": 50,
-                "orderBy": "timestamp.desc"
-            }
-            
             response = requests.get(url, headers=headers, params=params)
             response.raise_for_status()
             
-            traces = response.json().get("data", [])
+            # Newest first, so the first trace seen for a test is the latest one
+            for trace in response.json().get("data", []):
+                # Only this session's traces count, even if the server ignores the filter
+                if trace.get("sessionId") != session_id:
+                    continue
+                for name in wanted.intersection(_trace_test_names(trace, session_id)):
+                    trace_by_name.setdefault(name, trace.get("id"))
             
-            # Look for our specific trace
-            for trace in traces:
-                # Check tags in the trace
-                trace_tags = trace.get("tags", [])
-                # Also check metadata.attributes.langfuse.tags
-                metadata = trace.get("metadata", {})
-                attributes = metadata.get("attributes", {})
-                attr_tags = attributes.get("langfuse.tags", [])
-                
-                # Parse attr_tags if it's a JSON string
-                if isinstance(attr_tags, str):
-                    try:
-                        attr_tags = json.loads(attr_tags)
-                    except:
-                        attr_tags = []
-                
-                # Check if this trace matches our test case
-                all_tags = trace_tags + attr_tags
-                if test_case_name in all_tags:
-                    return trace.get("id")
-                
-                # Also check session ID
-                if attributes.get("session.id") == session_id and attributes.get("test.name") == test_case_name:
-                    return trace.get("id")
+            if len(trace_by_name) == len(wanted):
+                break
             
-            # If not found, wait and retry
+            # If not all found, wait and retry
             if retry < max_retries - 1:
-                print(f"   ⏳ Trace not found yet, retrying in 2s...")
-                time.sleep(2)
+                print(f"   ⏳ {len(trace_by_name)}/{len(wanted)} traces found, retrying in {delay:g}s...")
                 
-        except Exception as e:
+        except requests.RequestException as e:
             print(f"   ⚠️  Error fetching traces: {str(e)}")
-            if retry < max_retries - 1:
-                time.sleep(2)
+        
+        # Traces usually show up within a second, so start short and back off
+        if retry < max_retries - 1:
+            time.sleep(delay)
+            delay = min(delay * 2, 4.0)
     
-    return None
+    return trace_by_name
+
+
+def save_results(path: str, payload: Dict[str, Any]) -> None:
+    """Write results as indented JSON, serializing with orjson when available"""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    else:
+        # Serialize first so the file is written in one call rather than per chunk
+        with open(path, "w") as f:
+            f.write(json.dumps(payload, indent=2))
+
+
+def run_test_case(i: int, test_case: Dict[str, Any], session_id: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Run one test case's agent call and evaluate the answer.
+    
+    Output is collected rather than printed so concurrently running tests
+    can be reported in order.
+    
+    Returns:
+        Tuple of (result dict, printed output)
+    """
+    out = io.StringIO()
+    print(f"\n🧪 Test {i}/{len(TEST_CASES)}: {test_case['name']}", file=out)
+    print(f"📝 Category: {test_case['category']}", file=out)
+    print(f"❓ Question: {test_case['user']}", file=out)
+    print(f"🎯 Expected: {test_case['expected_answer']}", file=out)
+    
+    try:
+        # Create agent with test-specific attributes
+        # NOTE: We use natural Strands integration here - no Langfuse wrapping
+        # Strands uses OTEL telemetry which creates traces with auto-generated IDs
+        agent = create_agent(
+            system_prompt=test_case["system"],
+            session_id=session_id,
+            user_id="scoring-evaluator",
+            tags=["strands-scoring", test_case["name"], test_case["category"]],
+            callback_handler=None,  # test cases run in threads; output is collected in out
+            **{
+                "test.name": test_case["name"],
+                "test.category": test_case["category"],
+                "test.expected": test_case["expected_answer"],
+                "test.method": test_case["scoring_method"]
+            }
+        )
+        
+        # Execute the agent - this creates OTEL traces automatically
+        response = agent(test_case["user"])
+        answer = str(response)
+        
+        print(f"🤖 Response: {answer[:150]}{'...' if len(answer) > 150 else ''}", file=out)
+        
+        print(format_dashboard_metrics(response, trace_id="pending-batch-scoring", model_id=get_model_id(agent)), file=out)
+        
+        # Evaluate the response
+        score_result = evaluate_response(answer, test_case)
+        
+        # Color code the score
+        score_value = score_result['score']
+        if score_value >= 0.8:
+            score_emoji = "✅"
+        elif score_value >= 0.5:
+            score_emoji = "⚠️"
+        else:
+            score_emoji = "❌"
+        
+        print(f"{score_emoji} Score: {score_value:.2f}", file=out)
+        print(f"💭 Reasoning: {score_result['reasoning']}", file=out)
+        
+        print("-" * 70, file=out)
+        
+        result = {
+            "test_case": test_case["name"],
+            "category": test_case["category"],
+            "question": test_case["user"],
+            "expected": test_case["expected_answer"],
+            "actual": answer,
+            "score": score_value,
+            "reasoning": score_result["reasoning"],
+            "method": test_case["scoring_method"],
+            "trace_id": None,  # Will be found later
+            "scores_sent": False,  # Will be updated after batch scoring
+            "tokens": response.metrics.accumulated_usage['totalTokens'],
+            "input_tokens": response.metrics.accumulated_usage.get('inputTokens', 0),
+            "output_tokens": response.metrics.accumulated_usage.get('outputTokens', 0),
+            "latency_ms": response.metrics.accumulated_metrics['latencyMs']
+        }
+        
+    except Exception as e:
+        print(f"❌ Error: {str(e)}", file=out)
+        result = {
+            "test_case": test_case["name"],
+            "category": test_case["category"],
+            "question": test_case["user"],
+            "expected": test_case["expected_answer"],
+            "actual": f"ERROR: {str(e)}",
+            "score": 0.0,
+            "reasoning": f"Error occurred: {str(e)}",
+            "method": test_case["scoring_method"],
+            "trace_id": "error",
+            "scores_sent": False,
+            "tokens": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "latency_ms": 0
+        }
+    
+    return result, out.getvalue()
 
 
 def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
@@ -264,7 +461,7 @@ def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
     langfuse_client = get_langfuse_client(langfuse_pk, langfuse_sk, langfuse_host)
     
     if not session_id:
-        session_id = f"scoring-demo-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        session_id = f"scoring-demo-{datetime.now():%Y%m%d-%H%M%S}"
     
     print("🎯 Starting Strands Agents + Langfuse Scoring Demo")
     print(f"📊 Session ID: {session_id}")
@@ -275,93 +472,20 @@ def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
     results = []
     trace_ids = []  # Store trace IDs for scoring
     
-    for i, test_case in enumerate(TEST_CASES, 1):
-        print(f"\n🧪 Test {i}/{len(TEST_CASES)}: {test_case['name']}")
-        print(f"📝 Category: {test_case['category']}")
-        print(f"❓ Question: {test_case['user']}")
-        print(f"🎯 Expected: {test_case['expected_answer']}")
-        
-        try:
-            # Create agent with test-specific attributes
-            # NOTE: We use natural Strands integration here - no Langfuse wrapping
-            # Strands uses OTEL telemetry which creates traces with auto-generated IDs
-            agent = create_agent(
-                system_prompt=test_case["system"],
-                session_id=session_id,
-                user_id="scoring-evaluator",
-                tags=["strands-scoring", test_case["name"], test_case["category"]],
-                **{
-                    "test.name": test_case["name"],
-                    "test.category": test_case["category"],
-                    "test.expected": test_case["expected_answer"],
-                    "test.method": test_case["scoring_method"]
-                }
-            )
-            
-            # Execute the agent - this creates OTEL traces automatically
-            response = agent(test_case["user"])
-            answer = str(response)
-            
-            print(f"🤖 Response: {answer[:150]}{'...' if len(answer) > 150 else ''}")
-            
-            print(format_dashboard_metrics(response, trace_id="pending-batch-scoring"))
-            
-            # Evaluate the response
-            score_result = evaluate_response(answer, test_case)
-            
-            # Color code the score
-            score_value = score_result['score']
-            if score_value >= 0.8:
-                score_emoji = "✅"
-            elif score_value >= 0.5:
-                score_emoji = "⚠️"
-            else:
-                score_emoji = "❌"
-            
-            print(f"{score_emoji} Score: {score_value:.2f}")
-            print(f"💭 Reasoning: {score_result['reasoning']}")
-            
-            print("-" * 70)
-            
-            results.append({
-                "test_case": test_case["name"],
-                "category": test_case["category"],
-                "question": test_case["user"],
-                "expected": test_case["expected_answer"],
-                "actual": answer,
-                "score": score_value,
-                "reasoning": score_result["reasoning"],
-                "method": test_case["scoring_method"],
-                "trace_id": None,  # Will be found later
-                "scores_sent": False,  # Will be updated after batch scoring
-                "tokens": response.metrics.accumulated_usage['totalTokens'],
-                "input_tokens": response.metrics.accumulated_usage.get('inputTokens', 0),
-                "output_tokens": response.metrics.accumulated_usage.get('outputTokens', 0),
-                "latency_ms": response.metrics.accumulated_metrics['latencyMs']
-            })
-            
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-            results.append({
-                "test_case": test_case["name"],
-                "category": test_case["category"],
-                "question": test_case["user"],
-                "expected": test_case["expected_answer"],
-                "actual": f"ERROR: {str(e)}",
-                "score": 0.0,
-                "reasoning": f"Error occurred: {str(e)}",
-                "method": test_case["scoring_method"],
-                "trace_id": "error",
-                "scores_sent": False,
-                "tokens": 0,
-                "input_tokens": 0,
-                "output_tokens": 0,
-                "latency_ms": 0
-            })
-    
-    # Force flush telemetry before scoring
-    if hasattr(telemetry, 'tracer_provider') and hasattr(telemetry.tracer_provider, 'force_flush'):
-        telemetry.tracer_provider.force_flush()
+    # Test cases are independent agent calls, so run them concurrently and
+    # report them in order; each call still gets its own trace
+    with ThreadPoolExecutor(max_workers=len(TEST_CASES)) as executor:
+        futures = [
+            executor.submit(run_test_case, i, test_case, session_id)
+            for i, test_case in enumerate(TEST_CASES, 1)
+        ]
+        for future in futures:
+            result, output = future.result()
+            sys.stdout.write(output)
+            results.append(result)
+    
+    # Force flush telemetry once, after every agent call has finished
+    flush_telemetry(telemetry)
     
     # Batch Scoring Phase
     # NOTE: We perform scoring as a separate batch operation because:
@@ -372,12 +496,13 @@ def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
     print("\n" + "=" * 70)
     print("📊 BATCH SCORING PHASE")
     print("=" * 70)
-    print("⏳ Waiting 10 seconds for all traces to be processed...")
-    time.sleep(10)
-    
     scores_sent = 0
     scores_failed = 0
     
+    # Look up every test's trace in one pass instead of one query per test
+    print("🔎 Polling Langfuse until every test's trace from this session is indexed...")
+    trace_by_name = fetch_traces_by_test(session_id, [r["test_case"] for r in results])
+    
     for i, result in enumerate(results):
         if result["score"] is None:  # Skip error results
             continue
@@ -385,13 +510,14 @@ def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
         print(f"\n🎯 Scoring test {i+1}/{len(results)}: {result['test_case']}")
         
         # Find the trace for this test
-        trace_id = find_trace_for_test(session_id, result["test_case"])
+        trace_id = trace_by_name.get(result["test_case"])
         
         if trace_id:
             result["trace_id"] = trace_id
             trace_ids.append(trace_id)
             
-            # Score the trace in Langfuse
+            # Score the trace in Langfuse. create_score only queues the event; the
+            # client ships queued scores in batches and flush() below drains the rest
             try:
                 # Automated scoring
                 langfuse_client.create_score(
@@ -438,25 +564,38 @@ def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
     print("📊 SCORING SUMMARY")
     print("=" * 70)
     
-    # Overall stats
+    # Overall stats, performance totals and per-category scores in one pass
+    total_score = 0.0
+    passed = partial_count = failed = 0
+    total_tokens = total_input_tokens = total_output_tokens = 0
+    total_latency = 0.0
+    categories = {}
+    for r in results:
+        score = r["score"]
+        total_score += score
+        if score >= 0.8:
+            passed += 1
+        elif score >= 0.5:
+            partial_count += 1
+        else:
+            failed += 1
+        total_tokens += r["tokens"]
+        total_input_tokens += r.get("input_tokens", 0)
+        total_output_tokens += r.get("output_tokens", 0)
+        total_latency += r["latency_ms"]
+        categories.setdefault(r["category"], []).append(score)
+    
     total_tests = len(results)
-    total_score = sum(r["score"] for r in results)
     avg_score = total_score / total_tests if total_tests > 0 else 0
-    passed = sum(1 for r in results if r["score"] >= 0.8)
-    partial = sum(1 for r in results if 0.5 <= r["score"] < 0.8)
-    failed = sum(1 for r in results if r["score"] < 0.5)
     
     print(f"\nTotal Tests: {total_tests}")
     print(f"Average Score: {avg_score:.2f}")
     print(f"✅ Passed (≥0.8): {passed}")
-    print(f"⚠️  Partial (0.5-0.79): {partial}")
+    print(f"⚠️  Partial (0.5-0.79): {partial_count}")
     print(f"❌ Failed (<0.5): {failed}")
     
     # Performance metrics
-    total_tokens = sum(r["tokens"] for r in results)
-    total_input_tokens = sum(r.get("input_tokens", 0) for r in results)
-    total_output_tokens = sum(r.get("output_tokens", 0) for r in results)
-    avg_latency = sum(r["latency_ms"] for r in results) / len(results) if results else 0
+    avg_latency = total_latency / total_tests if total_tests > 0 else 0
     print(f"\n📈 Performance Metrics:")
     print(f"Total Tokens Used: {total_tokens:,}")
     print(f"Average Latency: {avg_latency:.0f}ms")
@@ -472,17 +611,33 @@ def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
     
     # Category breakdown
     print("\n📂 By Category:")
-    categories = {}
-    for r in results:
-        cat = r["category"]
-        if cat not in categories:
-            categories[cat] = []
-        categories[cat].append(r["score"])
-    
+    by_category = {}
     for cat, scores in categories.items():
         cat_avg = sum(scores) / len(scores)
+        by_category[cat] = cat_avg
         print(f"  {cat}: {cat_avg:.2f} (n={len(scores)})")
     
+    # Save results for run_scoring_and_validate.py (best effort; Lambda has a read-only cwd)
+    output_file = f"scoring_results_{session_id}.json"
+    try:
+        save_results(output_file, {
+            "session_id": session_id,
+            "timestamp": datetime.now().isoformat(),
+            "trace_ids": trace_ids,
+            "summary": {
+                "total_tests": total_tests,
+                "average_score": avg_score,
+                "passed": passed,
+                "partial": partial_count,
+                "failed": failed,
+                "by_category": by_category
+            },
+            "results": results
+        })
+        print(f"\n💾 Results saved to {output_file}")
+    except OSError as e:
+        print(f"\n⚠️  Could not save results to {output_file}: {e}")
+    
     print(f"\n🔍 Check your Langfuse dashboard at {langfuse_host} to see the scores")
     if session_id:
         print(f"📍 Filter by tags: strands-scoring")
@@ -490,9 +645,7 @@ def run_demo(session_id: Optional[str] = None) -> Tuple[str, List[str]]:
     # Final flush
     print("\n🔄 Flushing remaining events to Langfuse...")
     langfuse_client.flush()
-    if hasattr(telemetry, 'tracer_provider') and hasattr(telemetry.tracer_provider, 'force_flush'):
-        telemetry.tracer_provider.force_flush()
-    time.sleep(3)  # Give time for final flush to complete
+    flush_telemetry(telemetry)
     
     # Prepare metrics for return
     metrics = {
@@ -6,41 +6,84 @@ echo "🏗️  Building Lambda layers with Docker for x86_64 architecture..."
 SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
 LAYERS_DIR="$SCRIPT_DIR/layers"
 BUILD_DIR="$SCRIPT_DIR/build"
+# Wheel cache shared by the Docker builds; kept apart from ~/.cache/pip since the container writes as root
+PIP_CACHE="${LAYER_PIP_CACHE:-$HOME/.cache/lambda-layer-pip}"
 
-# Clean previous builds
-rm -rf "$BUILD_DIR"
-mkdir -p "$BUILD_DIR"
+# Layers whose requirements.txt is unchanged are reused; pass --clean to rebuild everything
+if [ "$1" = "--clean" ]; then
+    rm -rf "$BUILD_DIR"
+fi
+rm -rf "$BUILD_DIR/function" "$BUILD_DIR/function-code.zip"
+mkdir -p "$BUILD_DIR" "$PIP_CACHE"
+
+# sha256 of a file (sha256sum on Linux, shasum on macOS)
+file_hash() {
+    if command -v sha256sum > /dev/null; then
+        sha256sum "$1" | cut -d' ' -f1
+    else
+        shasum -a 256 "$1" | cut -d' ' -f1
+    fi
+}
+
+# Bytecode caches are rebuilt by Lambda on import, so keep them out of the zips.
+# *.dist-info stays: OpenTelemetry discovers its context and exporters via entry points.
+ZIP_EXCLUDES=("*__pycache__*" "*.pyc" "*.pyo")
 
 # Function to build a layer
 build_layer() {
     local layer_name=$1
     local layer_dir=$2
+    local sentinel="$BUILD_DIR/${layer_name}.req.sha256"
+    local req_hash
+    req_hash=$(file_hash "$layer_dir/requirements.txt")
+    
+    # Skip the Docker pip install when the zip was built from these exact requirements
+    if [ -f "$BUILD_DIR/${layer_name}.zip" ] && [ "$(cat "$sentinel" 2>/dev/null)" = "$req_hash" ]; then
+        echo "♻️  $layer_name requirements unchanged, reusing $BUILD_DIR/${layer_name}.zip"
+        return 0
+    fi
     
     echo "📦 Building $layer_name layer..."
     
-    # Create layer structure
+    # Create layer structure from scratch
+    rm -rf "$BUILD_DIR/$layer_name" "$BUILD_DIR/${layer_name}.zip" "$sentinel"
     mkdir -p "$BUILD_DIR/$layer_name/python"
     
-    # Use Docker to install dependencies
+    # Use Docker to install dependencies; the mounted cache skips re-downloading
+    # wheels, and --no-compile skips writing .pyc files that are not shipped
     docker run --rm \
         --platform linux/amd64 \
         -v "$layer_dir:/var/task" \
         -v "$BUILD_DIR/$layer_name/python:/var/task/python" \
+        -v "$PIP_CACHE:/root/.cache/pip" \
         --entrypoint /bin/bash \
         public.ecr.aws/lambda/python:3.12 \
-        -c "pip install -r /var/task/requirements.txt -t /var/task/python --upgrade"
+        -c "pip install --no-compile --cache-dir /root/.cache/pip -r /var/task/requirements.txt -t /var/task/python --upgrade"
+    
+    # Create zip (in a subshell so parallel builds don't fight over the cwd);
+    # level 1 compresses several times faster than the default for a slightly larger file
+    (cd "$BUILD_DIR/$layer_name" && zip -1 -X -qr "../${layer_name}.zip" python/ -x "${ZIP_EXCLUDES[@]}")
     
-    # Create zip
-    cd "$BUILD_DIR/$layer_name"
-    zip -r "../${layer_name}.zip" python/
-    cd -
+    # Written last, so an interrupted build is never mistaken for a complete one
+    echo "$req_hash" > "$sentinel"
     
     echo "✅ Built $layer_name layer: $BUILD_DIR/${layer_name}.zip"
 }
 
-# Build layers
-build_layer "base-deps-layer" "$LAYERS_DIR/base-deps"
-build_layer "strands-layer" "$LAYERS_DIR/strands-layer"
+# Build layers concurrently - each pip install is network/disk bound
+build_layer "base-deps-layer" "$LAYERS_DIR/base-deps" &
+base_pid=$!
+build_layer "strands-layer" "$LAYERS_DIR/strands-layer" &
+strands_pid=$!
+
+# set -e does not cover background jobs, so check each exit status
+failed=0
+wait $base_pid || failed=1
+wait $strands_pid || failed=1
+if [ $failed -ne 0 ]; then
+    echo "❌ Layer build failed"
+    exit 1
+fi
 
 # Package function code
 echo "📦 Packaging function code..."
@@ -51,7 +94,7 @@ cp "$SCRIPT_DIR/lambda_handler.py" "$BUILD_DIR/function/"
 cp -r "$SCRIPT_DIR/../core" "$BUILD_DIR/function/"
 cp -r "$SCRIPT_DIR/../demos" "$BUILD_DIR/function/"
 cd "$BUILD_DIR/function"
-zip -r "../function-code.zip" .
+zip -1 -X -qr "../function-code.zip" . -x "${ZIP_EXCLUDES[@]}"
 cd -
 
 echo "✅ All layers and function code built successfully!"
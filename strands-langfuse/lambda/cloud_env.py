@@ -0,0 +1,32 @@
+"""
+Shared cloud.env loading for the Lambda deploy and test scripts
+"""
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from dotenv import dotenv_values
+
+CLOUD_ENV_FILE = Path(__file__).parent.parent / "cloud.env"
+
+
+@lru_cache(maxsize=1)
+def _parse_env_file(path, mtime_ns):
+    """Parse an env file into a dict; keyed on mtime so an edited file is re-read"""
+    return {key: value for key, value in dotenv_values(path).items() if value is not None}
+
+
+def load_cloud_env(path=CLOUD_ENV_FILE):
+    """
+    Load cloud.env into os.environ.
+
+    Returns:
+        dict: The parsed values, or None if the file does not exist
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    values = _parse_env_file(str(path), path.stat().st_mtime_ns)
+    os.environ.update(values)
+    return values
@@ -4,10 +4,37 @@ Deploy Strands-Langfuse Lambda using CloudFormation
 """
 import os
 import sys
-import json
+import hashlib
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+from cloud_env import load_cloud_env
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError, WaiterError
+except ImportError:
+    print("❌ boto3 is not installed. Please run: pip install boto3")
+    sys.exit(1)
+
+# One session and one client per service for the whole deployment,
+# instead of starting a new aws CLI process for every call
+SESSION = boto3.session.Session()
+REGION = SESSION.region_name or "us-east-1"
+STS = SESSION.client("sts", region_name=REGION)
+S3 = SESSION.client("s3", region_name=REGION)
+CFN = SESSION.client("cloudformation", region_name=REGION)
+
+# Build artifacts uploaded to S3 before the stack deploy
+ARTIFACTS = ["base-deps-layer.zip", "strands-layer.zip", "function-code.zip"]
+TEMPLATE_FILE = Path(__file__).parent / "cloudformation" / "template.yaml"
+
+# This stack usually settles in under a minute, so poll every 5s instead of the
+# default 30s, and allow up to an hour for slow updates
+STACK_WAITER_CONFIG = {"Delay": 5, "MaxAttempts": 720}
+CHANGE_SET_WAITER_CONFIG = {"Delay": 2, "MaxAttempts": 150}
+
 def run_command(cmd, check=True):
     """Run shell command and return output"""
     try:
@@ -24,18 +51,96 @@ def run_command(cmd, check=True):
 def load_environment():
     """Load environment variables from cloud.env"""
     print("📋 Loading environment variables...")
-    env_file = Path(__file__).parent.parent / "cloud.env"
-    
-    if not env_file.exists():
+    if load_cloud_env() is None:
         print("❌ Error: cloud.env not found. Please run setup.py first.")
         sys.exit(1)
+
+def bucket_exists(bucket_name):
+    """Return True if the bucket exists and is reachable with these credentials"""
+    try:
+        S3.head_bucket(Bucket=bucket_name)
+        return True
+    except ClientError:
+        return False
+
+def upload_artifact(bucket_name, artifact):
+    """
+    Upload a build artifact unless S3 already has the same content.
+    
+    The sha256 of each zip is stored as object metadata, so layers reused by
+    build-layers.sh (unchanged requirements) are not uploaded again.
+    
+    Returns:
+        bool: True if the artifact was uploaded, False if it was unchanged
+    """
+    path = Path("build") / artifact
+    key = f"layers/{artifact}"
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    digest = sha256.hexdigest()
+    
+    try:
+        if S3.head_object(Bucket=bucket_name, Key=key).get("Metadata", {}).get("sha256") == digest:
+            return False
+    except ClientError:
+        pass  # Not uploaded yet
+    
+    S3.upload_file(str(path), bucket_name, key, ExtraArgs={"Metadata": {"sha256": digest}})
+    return True
+
+def stack_exists(stack_name):
+    """Return True if the stack exists and is not a deleted or never-created stack"""
+    try:
+        stacks = CFN.describe_stacks(StackName=stack_name)["Stacks"]
+    except ClientError:
+        return False
+    return stacks[0]["StackStatus"] != "REVIEW_IN_PROGRESS"
+
+def deploy_stack(stack_name, parameters):
+    """Create or update the stack through a change set, like `aws cloudformation deploy`"""
+    change_set_type = "UPDATE" if stack_exists(stack_name) else "CREATE"
+    change_set_name = f"{stack_name}-{change_set_type.lower()}-{os.getpid()}"
+    
+    CFN.create_change_set(
+        StackName=stack_name,
+        ChangeSetName=change_set_name,
+        ChangeSetType=change_set_type,
+        TemplateBody=TEMPLATE_FILE.read_text(),
+        Parameters=[{"ParameterKey": k, "ParameterValue": v} for k, v in parameters.items()],
+        Capabilities=["CAPABILITY_IAM"],
+    )
+    
+    try:
+        CFN.get_waiter("change_set_create_complete").wait(
+            StackName=stack_name, ChangeSetName=change_set_name,
+            WaiterConfig=CHANGE_SET_WAITER_CONFIG
+        )
+    except WaiterError:
+        change_set = CFN.describe_change_set(StackName=stack_name, ChangeSetName=change_set_name)
+        reason = change_set.get("StatusReason", "")
+        # Same as --no-fail-on-empty-changeset
+        if "didn't contain changes" in reason or "No updates are to be performed" in reason:
+            print("✅ No changes to deploy")
+            CFN.delete_change_set(StackName=stack_name, ChangeSetName=change_set_name)
+            return
+        print(f"❌ Error: change set failed: {reason}")
+        sys.exit(1)
     
-    with open(env_file) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                os.environ[key] = value
+    CFN.execute_change_set(StackName=stack_name, ChangeSetName=change_set_name)
+    waiter_name = "stack_update_complete" if change_set_type == "UPDATE" else "stack_create_complete"
+    try:
+        CFN.get_waiter(waiter_name).wait(StackName=stack_name, WaiterConfig=STACK_WAITER_CONFIG)
+    except WaiterError:
+        stack = CFN.describe_stacks(StackName=stack_name)["Stacks"][0]
+        print(f"❌ Error: stack {stack['StackStatus']}: {stack.get('StackStatusReason', '')}")
+        # The stack reason is often generic; the failed resources say what went wrong
+        events = CFN.describe_stack_events(StackName=stack_name)["StackEvents"]
+        for event in events[:20]:
+            if event["ResourceStatus"].endswith("_FAILED"):
+                print(f"   {event['LogicalResourceId']}: {event.get('ResourceStatusReason', '')}")
+        sys.exit(1)
 
 def main():
     """Deploy Lambda with CloudFormation"""
@@ -45,8 +150,8 @@ def main():
     load_environment()
     
     # Get AWS account info
-    account_id = run_command("aws sts get-caller-identity --query Account --output text")
-    region = run_command("aws configure get region") or "us-east-1"
+    account_id = STS.get_caller_identity()["Account"]
+    region = REGION
     
     # Configuration
     stack_name = "strands-langfuse-lambda"
@@ -57,13 +162,15 @@ def main():
     print(f"🪣 S3 Bucket: {bucket_name}")
     
     # Check/create S3 bucket
-    bucket_exists = run_command(f"aws s3 ls s3://{bucket_name}", check=False)
-    if not bucket_exists:
+    if not bucket_exists(bucket_name):
         print("🪣 Creating S3 bucket...")
         if region == "us-east-1":
-            run_command(f"aws s3 mb s3://{bucket_name}")
+            S3.create_bucket(Bucket=bucket_name)
         else:
-            run_command(f"aws s3 mb s3://{bucket_name} --region {region}")
+            S3.create_bucket(
+                Bucket=bucket_name,
+                CreateBucketConfiguration={"LocationConstraint": region}
+            )
     else:
         print("✅ S3 bucket already exists")
     
@@ -71,40 +178,43 @@ def main():
     print("🔨 Building Lambda layers...")
     run_command("./build-layers.sh")
     
-    # Upload artifacts to S3
+    # Upload artifacts to S3 in parallel; the uploads are independent and network-bound.
+    # upload_file also splits large zips into concurrent multipart uploads.
     print("📤 Uploading artifacts to S3...")
-    for artifact in ["base-deps-layer.zip", "strands-layer.zip", "function-code.zip"]:
-        run_command(f"aws s3 cp build/{artifact} s3://{bucket_name}/layers/{artifact}")
+    with ThreadPoolExecutor(max_workers=len(ARTIFACTS)) as executor:
+        futures = {
+            executor.submit(upload_artifact, bucket_name, artifact): artifact
+            for artifact in ARTIFACTS
+        }
+        for future in as_completed(futures):
+            # result() re-raises a failed upload in the main thread
+            if future.result():
+                print(f"   ✅ {futures[future]}")
+            else:
+                print(f"   ♻️  {futures[future]} unchanged, skipped upload")
     
     # Deploy CloudFormation stack
     print("🏗️  Deploying CloudFormation stack...")
-    deploy_cmd = f"""
-    aws cloudformation deploy \
-      --stack-name {stack_name} \
-      --template-file cloudformation/template.yaml \
-      --parameter-overrides \
-        ArtifactsBucket={bucket_name} \
-        LangfusePublicKey={os.environ['LANGFUSE_PUBLIC_KEY']} \
-        LangfuseSecretKey={os.environ['LANGFUSE_SECRET_KEY']} \
-        LangfuseHost={os.environ['LANGFUSE_HOST']} \
-        BedrockRegion={os.environ['BEDROCK_REGION']} \
-        BedrockModelId={os.environ['BEDROCK_MODEL_ID']} \
-      --capabilities CAPABILITY_IAM \
-      --no-fail-on-empty-changeset
-    """
-    run_command(deploy_cmd)
+    deploy_stack(stack_name, {
+        "ArtifactsBucket": bucket_name,
+        "LangfusePublicKey": os.environ['LANGFUSE_PUBLIC_KEY'],
+        "LangfuseSecretKey": os.environ['LANGFUSE_SECRET_KEY'],
+        "LangfuseHost": os.environ['LANGFUSE_HOST'],
+        "BedrockRegion": os.environ['BEDROCK_REGION'],
+        "BedrockModelId": os.environ['BEDROCK_MODEL_ID'],
+        "MemorySize": os.environ.get('LAMBDA_MEMORY_SIZE', '1024'),
+    })
     
     # Get deployment outputs
     print("📋 Getting deployment information...")
     
-    outputs_cmd = f"aws cloudformation describe-stacks --stack-name {stack_name} --query 'Stacks[0].Outputs'"
-    outputs_json = run_command(outputs_cmd)
-    outputs = json.loads(outputs_json)
+    stack = CFN.describe_stacks(StackName=stack_name)["Stacks"][0]
+    outputs = {o['OutputKey']: o['OutputValue'] for o in stack.get('Outputs', [])}
     
     # Extract values
-    function_url = next(o['OutputValue'] for o in outputs if o['OutputKey'] == 'FunctionUrl')
-    custom_example = next(o['OutputValue'] for o in outputs if o['OutputKey'] == 'CurlExampleCustom')
-    monty_example = next(o['OutputValue'] for o in outputs if o['OutputKey'] == 'CurlExampleMontyPython')
+    function_url = outputs['FunctionUrl']
+    custom_example = outputs['CurlExampleCustom']
+    monty_example = outputs['CurlExampleMontyPython']
     
     # Display results
     print("\n✅ Deployment complete!")
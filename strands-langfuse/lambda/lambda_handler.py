@@ -4,21 +4,74 @@ Supports demo selection via JSON field
 """
 import os
 import json
-import uuid
+import secrets
 from datetime import datetime
 
+try:
+    import orjson
+    _loads = orjson.loads
+    
+    def _dumps(obj):
+        # Function URLs expect a str body
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
+
 # Initialize OTEL before any other imports
-from core.setup import initialize_langfuse_telemetry, setup_telemetry
+from core.setup import initialize_langfuse_telemetry, setup_telemetry, flush_telemetry
 langfuse_pk, langfuse_sk, langfuse_host = initialize_langfuse_telemetry()
 telemetry = setup_telemetry("lambda-strands-agents")
 
 from core.agent_factory import create_agent, create_bedrock_model
 from demos import scoring, examples, monty_python
 
+# Build the shared Bedrock model (and its boto3 client) during the init phase,
+# so warm invocations only construct the lightweight per-request Agent
+bedrock_model = create_bedrock_model()
+
+# Upper bound on the end-of-request span export
+FLUSH_TIMEOUT_MILLIS = 2000
+
+# Demo name -> (runner, default session prefix, count field, Langfuse filter tags)
+DEMOS = {
+    'scoring': (scoring.run_demo, 'lambda-scoring', 'test_results', ["strands-scoring"]),
+    'monty_python': (monty_python.run_demo, 'lambda-monty', 'interactions', ["monty-python"]),
+    'examples': (examples.run_demo, 'lambda-examples', 'examples_run', ["strands-demo"]),
+}
+
+RESPONSE_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*'
+}
+
+
+def build_response(status_code, payload):
+    """Wrap a payload in the Function URL response shape"""
+    return {
+        'statusCode': status_code,
+        'headers': RESPONSE_HEADERS,
+        'body': _dumps(payload)
+    }
+
+
+def trace_info(traces_created, run_tag, tags, session_id):
+    """Where to find this request's traces in Langfuse"""
+    return {
+        'traces_created': traces_created,
+        'langfuse_url': langfuse_host,
+        'view_instructions': {
+            'filter_by_run_id': run_tag,
+            'filter_by_tags': [*tags, run_tag],
+            'filter_by_session_id': session_id
+        }
+    }
+
+
 def handler(event, context):
     """Lambda handler with demo selection support"""
     try:
-        body = json.loads(event.get('body', '{}')) if isinstance(event.get('body'), str) else event
+        body = _loads(event.get('body', '{}')) if isinstance(event.get('body'), str) else event
         
         # Demo selection
         demo_name = body.get('demo', 'custom')
@@ -26,62 +79,19 @@ def handler(event, context):
         
         # Use provided session_id or generate unique run ID
         session_id = body.get('session_id')
-        run_id = str(uuid.uuid4())[:8]
+        run_id = secrets.token_hex(4)  # 8 hex chars straight from urandom, no UUID object
+        run_tag = f"run-{run_id}"
         timestamp = datetime.now().isoformat()
         
-        if demo_name == 'scoring':
-            final_session_id = session_id or f"lambda-scoring-{run_id}"
-            session_id, trace_ids, metrics = scoring.run_demo(final_session_id)
-            result = {
-                'demo': 'scoring',
-                'test_results': len(trace_ids),
-                'session_id': session_id,
-                'usage_summary': metrics,
-                'trace_info': {
-                    'traces_created': len(trace_ids),
-                    'langfuse_url': langfuse_host,
-                    'view_instructions': {
-                        'filter_by_run_id': f"run-{run_id}",
-                        'filter_by_tags': ["strands-scoring", f"run-{run_id}"],
-                        'filter_by_session_id': session_id
-                    }
-                }
-            }
-        elif demo_name == 'monty_python':
-            final_session_id = session_id or f"lambda-monty-{run_id}"
-            session_id, trace_ids, metrics = monty_python.run_demo(final_session_id)
+        if demo_name in DEMOS:
+            run_demo, session_prefix, count_field, tags = DEMOS[demo_name]
+            session_id, trace_ids, metrics = run_demo(session_id or f"{session_prefix}-{run_id}")
             result = {
-                'demo': 'monty_python',
-                'interactions': len(trace_ids),
+                'demo': demo_name,
+                count_field: len(trace_ids),
                 'session_id': session_id,
                 'usage_summary': metrics,
-                'trace_info': {
-                    'traces_created': len(trace_ids),
-                    'langfuse_url': langfuse_host,
-                    'view_instructions': {
-                        'filter_by_run_id': f"run-{run_id}",
-                        'filter_by_tags': ["monty-python", f"run-{run_id}"],
-                        'filter_by_session_id': session_id
-                    }
-                }
-            }
-        elif demo_name == 'examples':
-            final_session_id = session_id or f"lambda-examples-{run_id}"
-            session_id, trace_ids, metrics = examples.run_demo(final_session_id)
-            result = {
-                'demo': 'examples',
-                'examples_run': len(trace_ids),
-                'session_id': session_id,
-                'usage_summary': metrics,
-                'trace_info': {
-                    'traces_created': len(trace_ids),
-                    'langfuse_url': langfuse_host,
-                    'view_instructions': {
-                        'filter_by_run_id': f"run-{run_id}",
-                        'filter_by_tags': ["strands-demo", f"run-{run_id}"],
-                        'filter_by_session_id': session_id
-                    }
-                }
+                'trace_info': trace_info(len(trace_ids), run_tag, tags, session_id)
             }
         else:
             # Custom query mode (existing behavior)
@@ -90,7 +100,8 @@ def handler(event, context):
                 system_prompt="You are a helpful assistant. Be concise in your responses.",
                 session_id=final_session_id,
                 user_id="lambda-user",
-                tags=["lambda-demo", "custom", f"run-{run_id}"]
+                tags=["lambda-demo", "custom", run_tag],
+                model=bedrock_model
             )
             response = agent(query)
             # Calculate cost for custom query
@@ -111,48 +122,27 @@ def handler(event, context):
                     'output_tokens': output_tokens,
                     'estimated_cost': round(estimated_cost, 4)
                 },
-                'trace_info': {
-                    'traces_created': 1,
-                    'langfuse_url': langfuse_host,
-                    'view_instructions': {
-                        'filter_by_run_id': f"run-{run_id}",
-                        'filter_by_tags': ["lambda-demo", "custom", f"run-{run_id}"],
-                        'filter_by_session_id': final_session_id
-                    }
-                }
+                'trace_info': trace_info(1, run_tag, ["lambda-demo", "custom"], final_session_id)
             }
         
-        # Force flush telemetry
-        if hasattr(telemetry, 'tracer_provider') and hasattr(telemetry.tracer_provider, 'force_flush'):
-            telemetry.tracer_provider.force_flush()
+        # Force flush telemetry, bounded so a slow or unreachable Langfuse
+        # can't hold the invocation (and its billed duration) open
+        if not flush_telemetry(telemetry, timeout_millis=FLUSH_TIMEOUT_MILLIS):
+            print(f"⚠️  Telemetry flush did not finish within {FLUSH_TIMEOUT_MILLIS}ms")
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'success': True,
-                'run_id': run_id,
-                'timestamp': timestamp,
-                'langfuse_url': langfuse_host,
-                'trace_filter': f"run-{run_id}",
-                **result
-            })
-        }
+        return build_response(200, {
+            'success': True,
+            'run_id': run_id,
+            'timestamp': timestamp,
+            'langfuse_url': langfuse_host,
+            'trace_filter': run_tag,
+            **result
+        })
         
     except Exception as e:
         print(f"Error in Lambda handler: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'success': False,
-                'error': str(e),
-                'error_type': type(e).__name__
-            })
-        }
\ No newline at end of file
+        return build_response(500, {
+            'success': False,
+            'error': str(e),
+            'error_type': type(e).__name__
+        })
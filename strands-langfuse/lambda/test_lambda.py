@@ -9,23 +9,38 @@ import time
 import uuid
 import sys
 import requests
-from pathlib import Path
 from base64 import b64encode
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from cloud_env import load_cloud_env
+
+# Retries idempotent GETs (the Langfuse trace polls) on throttling and 5xx with
+# exponential backoff (0.5s, 1s, 2s, ...). POSTs are left to the default
+# allowed_methods, which excludes them, so a slow demo is never re-invoked.
+# The final response is returned rather than raised so its status can be reported.
+RETRY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=[429, 502, 503, 504],
+    raise_on_status=False
+)
+
+# One keep-alive session for every Lambda and Langfuse call, kept for the whole
+# interactive menu loop, so repeated tests and trace polls skip the TCP/TLS handshake
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=RETRY))
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=RETRY))
+
+# Function URL calls run a whole demo, so they get a no-retry adapter on the same
+# session, mounted once the URL is known (the longest matching prefix wins)
+FUNCTION_URL_ADAPTER = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0)
 
 def load_environment():
     """Load environment variables from cloud.env"""
-    env_file = Path(__file__).parent.parent / "cloud.env"
-    
-    if not env_file.exists():
+    if load_cloud_env() is None:
         print("❌ Error: cloud.env not found")
         return False
-    
-    with open(env_file) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                os.environ[key] = value
     return True
 
 def get_lambda_url():
@@ -72,7 +87,7 @@ def test_lambda(lambda_url, demo_name="custom", query=None, session_id=None):
     timeout = 120  # Increased timeout for complex demos
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             lambda_url,
             json=payload,
             headers={"Content-Type": "application/json"},
@@ -153,13 +168,16 @@ def check_langfuse_trace(session_id: str, langfuse_host: str, public_key: str, s
     
     print(f"\n🔍 Checking for trace in Langfuse...")
     
-    # Retry logic - Lambda traces may take a moment to appear
-    for attempt in range(5):
+    # Retry logic - Lambda traces may take a moment to appear, so poll with
+    # exponential backoff (0.5s doubling up to 4s) rather than a fixed wait
+    max_attempts = 8
+    delay = 0.5
+    for attempt in range(max_attempts):
         try:
             # Try traces endpoint
             traces_url = f"{langfuse_host}/api/public/traces"
             params = {"sessionId": session_id}
-            response = requests.get(traces_url, headers=headers, params=params)
+            response = SESSION.get(traces_url, headers=headers, params=params, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -170,11 +188,12 @@ def check_langfuse_trace(session_id: str, langfuse_host: str, public_key: str, s
         except Exception as e:
             print(f"Error checking trace: {e}")
         
-        if attempt < 4:
-            print(f"⏳ Waiting 3 seconds... (attempt {attempt + 2}/5)")
-            time.sleep(3)
+        if attempt < max_attempts - 1:
+            print(f"⏳ Waiting {delay:g} seconds... (attempt {attempt + 2}/{max_attempts})")
+            time.sleep(delay)
+            delay = min(delay * 2, 4)
     
-    print("❌ Trace not found after 5 attempts")
+    print(f"❌ Trace not found after {max_attempts} attempts")
     return False
 
 def show_menu():
@@ -279,11 +298,6 @@ def run_all_tests(lambda_url):
         print(f"Running Test {i+1}/{len(tests)}: {test['name']}")
         print(f"{'='*50}")
         
-        # Add a small delay between tests to avoid overwhelming the Lambda
-        if i > 0:
-            print("⏳ Waiting 2 seconds before next test...")
-            time.sleep(2)
-        
         # Test Lambda
         response = test_lambda(
             lambda_url, 
@@ -336,6 +350,7 @@ def main():
         print("❌ Lambda URL is required")
         sys.exit(1)
     
+    SESSION.mount(lambda_url, FUNCTION_URL_ADAPTER)
     print(f"🔗 Using Lambda URL: {lambda_url}")
     
     # Interactive menu loop
@@ -369,6 +384,7 @@ if __name__ == "__main__":
         if load_environment():
             lambda_url = get_lambda_url()
             if lambda_url:
+                SESSION.mount(lambda_url, FUNCTION_URL_ADAPTER)
                 run_all_tests(lambda_url)
     else:
         # Interactive mode
@@ -15,6 +15,7 @@ Usage:
 """
 
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import time
 import os
@@ -24,9 +25,18 @@ from dotenv import load_dotenv
 from base64 import b64encode
 import json
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 # Load environment variables
 load_dotenv()
 
+# Shared HTTP session so Langfuse calls reuse pooled keep-alive connections
+SESSION = requests.Session()
+
 def get_auth_header():
     """Create Basic Auth header for Langfuse API"""
     public_key = os.getenv('LANGFUSE_PUBLIC_KEY')
@@ -35,11 +45,17 @@ def get_auth_header():
     encoded_credentials = b64encode(credentials.encode()).decode('ascii')
     return {"Authorization": f"Basic {encoded_credentials}"}
 
+def _get_json(url, **kwargs):
+    """GET a Langfuse API endpoint and decode the JSON body from raw bytes"""
+    response = SESSION.get(url, headers=get_auth_header(), **kwargs)
+    response.raise_for_status()
+    return _loads(response.content)
+
 def check_langfuse_health():
     """Check if Langfuse is accessible"""
     host = os.getenv('LANGFUSE_HOST')
     try:
-        response = requests.get(f"{host}/api/public/health", headers=get_auth_header(), timeout=5)
+        response = SESSION.get(f"{host}/api/public/health", headers=get_auth_header(), timeout=5)
         if response.status_code == 200:
             data = response.json()
             print(f"   Version: {data.get('version', 'Unknown')}")
@@ -64,7 +80,6 @@ def get_recent_traces(from_time, run_id=None):
     """Fetch traces created after the specified time"""
     host = os.getenv('LANGFUSE_HOST')
     url = f"{host}/api/public/traces"
-    headers = get_auth_header()
     
     params = {
         "limit": 100,
@@ -73,9 +88,7 @@ def get_recent_traces(from_time, run_id=None):
     }
     
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = _get_json(url, params=params)
         traces = data.get('data', [])
         
         # Filter for Strands traces with our run ID
@@ -317,14 +330,20 @@ def main():
     # Step 1: Check prerequisites
     print("\n1️⃣ Checking prerequisites...")
     
-    print("   Checking Langfuse connectivity...")
-    if not check_langfuse_health():
+    # The two checks are independent, so run them side by side
+    print("   Checking Langfuse connectivity and AWS credentials...")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        langfuse_future = executor.submit(check_langfuse_health)
+        aws_future = executor.submit(check_aws_credentials)
+        langfuse_ok = langfuse_future.result()
+        aws_ok = aws_future.result()
+    
+    if not langfuse_ok:
         print("   ❌ Langfuse is not accessible. Please ensure it's running.")
         return 1
     print("   ✅ Langfuse is accessible")
     
-    print("   Checking AWS credentials...")
-    if not check_aws_credentials():
+    if not aws_ok:
         print("   ❌ AWS credentials not configured. Please configure AWS credentials.")
         return 1
     print("   ✅ AWS credentials configured")
@@ -37,7 +37,7 @@ def save_env_file(filename, config):
     """Save environment variables to file"""
     lines = [
         "# Strands + Langfuse Configuration",
-        f"# Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"# Generated on {datetime.now():%Y-%m-%d %H:%M:%S}",
         "",
         "# AWS Bedrock Configuration",
         f"AWS_REGION={config.get('AWS_REGION', 'us-east-1')}",
@@ -57,8 +57,13 @@ def save_env_file(filename, config):
     
     lines.append("")
     
-    with open(filename, 'w') as f:
-        f.write('\n'.join(lines))
+    # Single write; new files are created owner-only since they hold secrets
+    payload = '\n'.join(lines).encode('utf-8')
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
     print(f"✅ Updated {filename}")
 
 